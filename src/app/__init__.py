@@ -1,20 +1,22 @@
 import logging
 
 from ._config import Config
+from .shared.log import configure_logging
+
+config = Config.from_env()
 
 ## Seting logger
 # Configure logging once at the application level
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s :: %(message)s",
-    handlers=[logging.StreamHandler()],
+configure_logging(
+    level=config.LOG_LEVEL,
+    format=config.LOG_FORMAT,
+    use_queue=config.LOG_ASYNC,
+    offer_level=config.LOG_OFFER_LEVEL,
+    offer_sample_rate=config.LOG_OFFER_SAMPLE_RATE,
 )
 
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
 
-config = Config.from_env()
-
-
 __all__ = ["config", "logger"]
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from dotenv import load_dotenv
 
@@ -17,6 +18,95 @@ class Config(BaseModel):
 
     RELAX_TIME_EACH_ROUND: float
 
+    # Crawler
+    CRAWL_WORKERS: int = 1
+    HOST_MIN_INTERVAL: float = 0
+    FETCH_BACKEND: Literal["browser", "http", "replay"] = "browser"
+    # Raw payloads are recorded here when set, "replay" serves them back
+    CAPTURE_DIR: str = ""
+    HTTP_FETCH_MODE: Literal["json", "html"] = "json"
+    HTTP_TIMEOUT: float = 20
+    MAX_OFFER_PAGES: int = 10
+    PAGE_FETCH_CONCURRENCY: int = 3
+    PAGE_CACHE_SIZE: int = 256
+    EXTRACT_ENGINE: Literal["bs4", "scan", "cdp"] = "scan"
+    OFFER_DECODER: Literal["pydantic", "lean"] = "lean"
+    EVALUATION_ENGINE: Literal["python", "columnar"] = "columnar"
+
+    # Requests failed by the browser session, comma separated lists of CDP
+    # resource types and url globs. Off by default: every request is paused
+    # until answered, turn it on once checked against a live session
+    BLOCK_RESOURCES: bool = False
+    BLOCK_RESOURCE_TYPES: str = "Image,Media,Font,Stylesheet,Ping,Manifest"
+    BLOCK_URL_PATTERNS: str = (
+        "*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,"
+        "*cloudflareinsights.com*,*facebook.net*,*hotjar.com*,*sentry.io*"
+    )
+
+    # Browser recycling, 0 disables a limit
+    BROWSER_MAX_PAGES: int = 500
+    BROWSER_MAX_RSS_MB: float = 1500
+    BROWSER_STANDBY: bool = True
+
+    SHEET_HANDLE_TTL: float = 600
+
+    BLACKLIST_TTL: float = 300
+    BLACKLIST_CASE_INSENSITIVE: bool = False
+
+    SHEET_DIFF_WRITES: bool = True
+    HEARTBEAT_INTERVAL_MINUTES: float = 0
+
+    # Sheets quota, requests per minute per user
+    SHEETS_READS_PER_MINUTE: float = 60
+    SHEETS_WRITES_PER_MINUTE: float = 60
+    SHEETS_BURST: float = 10
+    SHEETS_BACKOFF_BASE: float = 2
+    SHEETS_BACKOFF_MAX: float = 64
+
+    # Circuit breakers for gameboost and Sheets: consecutive failures to open,
+    # seconds before a probe
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 60
+
+    # Metrics endpoint, disabled when 0
+    METRICS_PORT: int = 0
+
+    # Logging: records are queued and formatted on a listener thread when
+    # async, json writes one object per line with the row, url and stage.
+    # Per-offer lines have their own level and a sample rate in [0, 1]
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_ASYNC: bool = True
+    LOG_OFFER_LEVEL: str = "INFO"
+    LOG_OFFER_SAMPLE_RATE: float = 1.0
+
+    # Scheduler
+    SCHEDULER: Literal["round", "adaptive"] = "round"
+    SCHEDULER_MIN_INTERVAL: float = 60
+    SCHEDULER_MAX_INTERVAL: float = 1800
+    SCHEDULER_SYNC_INTERVAL: float = 300
+
+    # Row sharding across processes or machines, "none" runs every row locally
+    COORDINATION: Literal["none", "sqlite"] = "none"
+    LEASE_DB_PATH: str = "leases.sqlite3"
+    LEASE_SECONDS: float = 300
+    LEASE_REPEAT_INTERVAL: float = 60
+    WORKER_ID: str = ""
+
+    # Local offer history, disabled when the path is empty
+    PRICE_HISTORY_PATH: str = ""
+    PRICE_HISTORY_BATCH_SIZE: int = 5000
+    PRICE_HISTORY_FLUSH_INTERVAL: float = 60
+
+    # Sheet writer
+    WRITE_BATCH_SIZE: int = 20
+    WRITE_FLUSH_INTERVAL: float = 15
+    WRITE_MAX_PENDING: int = 200
+
+    # Overlap fetching with evaluation and writing, fetched groups queued
+    PIPELINED: bool = True
+    PIPELINE_QUEUE_SIZE: int = 4
+
     @staticmethod
     def from_env(dotenv_path: str = "settings.env") -> "Config":
         load_dotenv(dotenv_path)
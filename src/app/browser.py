@@ -0,0 +1,159 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager, ExitStack
+from typing import Callable, Self
+
+import psutil
+
+from .shared.metrics import metrics
+from . import logger
+
+# Chrome/driver setup is racy when several sessions start at once
+_launch_lock = threading.Lock()
+
+# Standby is launched ahead of time once usage crosses this share of a limit
+STANDBY_THRESHOLD = 0.8
+
+
+class BrowserSession:
+    def __init__(self, sb, stack: ExitStack) -> None:
+        self.sb = sb
+        self.stack = stack
+        self.pages = 0
+
+    def rss_mb(self) -> float:
+        # Driver process plus every Chrome process below it
+        driver = getattr(self.sb, "driver", None)
+        pid = getattr(driver, "browser_pid", None)
+        if pid is None:
+            service = getattr(driver, "service", None)
+            pid = getattr(getattr(service, "process", None), "pid", None)
+        if pid is None:
+            return 0
+
+        try:
+            root = psutil.Process(pid)
+            processes = [root, *root.children(recursive=True)]
+        except psutil.Error:
+            return 0
+
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return rss / 2**20
+
+    def is_healthy(self) -> bool:
+        try:
+            self.sb.cdp.get_current_url()
+            return True
+        except Exception as e:
+            logger.info(f"Browser health check failed: {e}")
+            return False
+
+    def close(self) -> None:
+        try:
+            self.stack.close()
+        except Exception as e:
+            logger.info(f"Browser close failed: {e}")
+
+
+class ManagedBrowser:
+    # Stands in for ``sb``: attributes are forwarded to the current session,
+    # ``maintain`` swaps sessions between rows
+    def __init__(
+        self,
+        open_session: Callable[[], AbstractContextManager],
+        max_pages: int,
+        max_rss_mb: float,
+        standby: bool,
+    ) -> None:
+        self.open_session = open_session
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.standby = standby
+
+        self._current: BrowserSession | None = None
+        self._standby: Future[BrowserSession] | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="browser-standby"
+        )
+
+    def __enter__(self) -> Self:
+        self._current = self._launch()
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self._standby is not None:
+            try:
+                self._standby.result().close()
+            except Exception as e:
+                logger.info(f"Standby browser failed: {e}")
+            self._standby = None
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        self._executor.shutdown()
+
+    def __getattr__(self, name: str):
+        current = self.__dict__.get("_current")
+        if current is None:
+            raise AttributeError(name)
+        return getattr(current.sb, name)
+
+    def get(self, url: str, *args, **kwargs):
+        self._current.pages += 1
+        return self._current.sb.get(url, *args, **kwargs)
+
+    def _launch(self) -> BrowserSession:
+        with _launch_lock:
+            stack = ExitStack()
+            try:
+                sb = stack.enter_context(self.open_session())
+            except BaseException:
+                stack.close()
+                raise
+        metrics.inc("gb_browser_launches_total")
+        return BrowserSession(sb, stack)
+
+    def _usage(self) -> tuple[float, float]:
+        # Share of the page and memory budgets used by the current session
+        pages = self._current.pages / self.max_pages if self.max_pages else 0
+        rss = self._current.rss_mb() / self.max_rss_mb if self.max_rss_mb else 0
+        return pages, rss
+
+    def _take_standby(self) -> BrowserSession:
+        standby, self._standby = self._standby, None
+        if standby is not None:
+            try:
+                return standby.result()
+            except Exception as e:
+                logger.info(f"Standby browser failed, launch a new one: {e}")
+        return self._launch()
+
+    def recycle(self, reason: str) -> None:
+        logger.info(f"Recycle browser after {self._current.pages} pages: {reason}")
+        metrics.inc("gb_browser_recycles_total", reason=reason)
+        old, self._current = self._current, self._take_standby()
+        # Closing Chrome can take a while, do not hold the crawl for it
+        threading.Thread(target=old.close, name="browser-close", daemon=True).start()
+
+    def maintain(self) -> None:
+        if not self._current.is_healthy():
+            self.recycle("unhealthy")
+            return
+
+        pages, rss = self._usage()
+        if pages >= 1:
+            self.recycle("pages")
+        elif rss >= 1:
+            self.recycle("memory")
+        elif (
+            self.standby
+            and self._standby is None
+            and max(pages, rss) >= STANDBY_THRESHOLD
+        ):
+            logger.info("Warm up standby browser")
+            self._standby = self._executor.submit(self._launch)
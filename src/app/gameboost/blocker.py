@@ -0,0 +1,93 @@
+import fnmatch
+import re
+import threading
+
+import mycdp
+
+from ..shared.metrics import metrics
+from . import logger
+
+
+def split_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class PageTraffic:
+    __slots__ = ("requests", "blocked", "blocked_types", "bytes")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.blocked = 0
+        self.blocked_types: dict[str, int] = {}
+        self.bytes = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"requests={self.requests}, blocked={self.blocked} "
+            f"{self.blocked_types}, received={self.bytes / 1024:.1f}KiB"
+        )
+
+
+class ResourceBlocker:
+    # Pauses every request of the session through the CDP Fetch domain and
+    # fails those matching a blocked resource type or url pattern
+    def __init__(self, resource_types: list[str], url_patterns: list[str]) -> None:
+        self.resource_types = frozenset(resource_types)
+        self.url_pattern = (
+            re.compile("|".join(fnmatch.translate(p) for p in url_patterns))
+            if url_patterns
+            else None
+        )
+
+        self._page = PageTraffic()
+        self._lock = threading.Lock()
+
+    def install(self, sb) -> None:
+        sb.cdp.add_handler(mycdp.fetch.RequestPaused, self.on_request_paused)
+        sb.cdp.add_handler(mycdp.network.LoadingFinished, self.on_loading_finished)
+        logger.info(
+            f"Block resource types: {sorted(self.resource_types)}, "
+            f"url patterns: {self.url_pattern is not None}"
+        )
+
+    def is_blocked(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types:
+            return True
+        return self.url_pattern is not None and bool(self.url_pattern.match(url))
+
+    def on_request_paused(self, event: mycdp.fetch.RequestPaused, tab) -> None:
+        resource_type = event.resource_type.value
+        blocked = self.is_blocked(resource_type, event.request.url)
+        with self._lock:
+            self._page.requests += 1
+            if blocked:
+                self._page.blocked += 1
+                self._page.blocked_types[resource_type] = (
+                    self._page.blocked_types.get(resource_type, 0) + 1
+                )
+
+        # Paused requests hang the page until answered, never await here
+        if blocked:
+            metrics.inc("gb_blocked_requests_total", type=resource_type)
+            tab.feed_cdp(
+                mycdp.fetch.fail_request(
+                    event.request_id, mycdp.network.ErrorReason.BLOCKED_BY_CLIENT
+                )
+            )
+        else:
+            tab.feed_cdp(mycdp.fetch.continue_request(request_id=event.request_id))
+
+    def on_loading_finished(self, event: mycdp.network.LoadingFinished) -> None:
+        with self._lock:
+            self._page.bytes += event.encoded_data_length
+        metrics.inc("gb_received_bytes_total", event.encoded_data_length)
+
+    def start_page(self) -> None:
+        with self._lock:
+            self._page = PageTraffic()
+
+    def finish_page(self, url: str) -> PageTraffic:
+        with self._lock:
+            page = self._page
+        logger.info(f"Page traffic for {url}: {page}")
+        return page
@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from ..paths import ROOT_PATH
+from .exceptions import CrwlError
+from . import logger
+
+INDEX_NAME = "index.jsonl"
+
+
+class CaptureStore:
+    # Raw data-page payloads, gzip compressed and stored once per content hash
+    # under ``objects/``. ``index.jsonl`` maps every fetch (url, time) to its
+    # hash, the latest entry of a url wins on replay
+    def __init__(self, path: str) -> None:
+        self.path = ROOT_PATH.joinpath(path)
+        self.objects_path = self.path.joinpath("objects")
+        self.index_path = self.path.joinpath(INDEX_NAME)
+
+        self._index: dict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(payload: str) -> str:
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_path.joinpath(digest[:2], f"{digest}.json.gz")
+
+    def record(self, url: str, payload: str) -> str:
+        digest = self.digest(payload)
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            # Written aside and renamed, a crash never leaves half an object
+            tmp_path = object_path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(gzip.compress(payload.encode(), compresslevel=6))
+            os.replace(tmp_path, object_path)
+
+        entry = json.dumps({"url": url, "digest": digest, "time": time.time()})
+        with self._lock:
+            with self.index_path.open("a", encoding="utf-8") as f:
+                f.write(entry + "\n")
+            if self._index is not None:
+                self._index[url] = digest
+        return digest
+
+    def index(self) -> dict[str, str]:
+        with self._lock:
+            if self._index is None:
+                self._index = {}
+                if self.index_path.exists():
+                    with self.index_path.open(encoding="utf-8") as f:
+                        for line in f:
+                            entry = json.loads(line)
+                            self._index[entry["url"]] = entry["digest"]
+                logger.info(f"Capture index: {len(self._index)} urls in {self.path}")
+            return self._index
+
+    def load(self, url: str) -> str:
+        digest = self.index().get(url)
+        if digest is None:
+            raise CrwlError(f"No capture for url: {url}")
+        return gzip.decompress(self._object_path(digest).read_bytes()).decode()
@@ -1,32 +1,135 @@
 import random
+from typing import Literal
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-from bs4 import BeautifulSoup
-from .models import PageData
-from .exceptions import CrwlError
+from app import config
+
+from .capture import CaptureStore
+from .exceptions import ChallengeError, CrwlError
+from .http_client import InertiaClient
+from .parsers import extract_data_page_with_scan, extract_data_page_with_soup
+from .ratelimit import HostRateLimiter
+from ..shared.breaker import CircuitBreaker
+from ..shared.metrics import metrics
 from . import logger
 
+inertia_client = InertiaClient(
+    mode=config.HTTP_FETCH_MODE,
+    timeout=config.HTTP_TIMEOUT,
+)
+host_rate_limiter = HostRateLimiter(min_interval=config.HOST_MIN_INTERVAL)
+gameboost_breaker = CircuitBreaker(
+    name="gameboost",
+    failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=config.BREAKER_RESET_TIMEOUT,
+)
+capture_store = CaptureStore(config.CAPTURE_DIR) if config.CAPTURE_DIR else None
+
 
-def get_soup(sb, url: str) -> BeautifulSoup:
-    logger.info(f"Get soup for url: {url}")
+@metrics.timed("gb_stage_seconds", stage="get_page_source")
+def get_page_source(sb, url: str) -> str:
+    logger.info(f"Get page source for url: {url}")
+    # Set up in ``main.open_browser`` when resource blocking is enabled
+    blocker = getattr(sb, "resource_blocker", None)
+    if blocker is not None:
+        blocker.start_page()
     sb.get(url)
     sb.cdp.sleep(random.uniform(0.5, 0.9))
-    soup = BeautifulSoup(sb.cdp.get_page_source(), "html.parser")
+    page_source = sb.cdp.get_page_source()
     sb.cdp.sleep(random.uniform(0.3, 0.7))
-    return soup
-
+    if blocker is not None:
+        blocker.finish_page(url)
+    return page_source
 
-def extract_page_data(sb, url: str) -> PageData:
-    soup = get_soup(sb, url)
-    app_tag = soup.select_one("#app")
 
-    if not app_tag:
-        raise CrwlError("App tag not found!!!")
-
-    page_data = app_tag.attrs.get("data-page", None)
+def extract_data_page_with_cdp(sb) -> str:
+    page_data = sb.cdp.get_element_attribute("#app", "data-page")
     if not page_data:
         raise CrwlError("Page data not found!!!")
 
-    # with open("data.json", "w") as f:
-    #     json.dump(json.loads(page_data), f)
+    return str(page_data)
+
+
+@metrics.timed("gb_stage_seconds", stage="extract_page_data")
+def extract_raw_page_data(
+    sb,
+    url: str,
+    backend: Literal["browser", "http", "replay"] | None = None,
+) -> str:
+    backend = backend or config.FETCH_BACKEND
+    if backend == "replay":
+        if capture_store is None:
+            raise CrwlError("Replay needs CAPTURE_DIR")
+        return capture_store.load(url)
+
+    # Fails with CircuitOpenError while gameboost keeps failing
+    with gameboost_breaker.call():
+        page_data = fetch_raw_page_data(sb, url, backend)
+
+    if capture_store is not None:
+        capture_store.record(url, page_data)
+    return page_data
+
+
+def fetch_raw_page_data(
+    sb,
+    url: str,
+    backend: Literal["browser", "http"] | None = None,
+) -> str:
+    host_rate_limiter.wait(url)
+
+    if (backend or config.FETCH_BACKEND) == "http":
+        try:
+            return inertia_client.fetch(url)
+        except ChallengeError as e:
+            # Without a browser the caller has to retry the page itself
+            if sb is None:
+                raise
+            logger.info(f"HTTP fetch blocked, fallback to browser: {e}")
+            host_rate_limiter.wait(url)
+
+    engine = config.EXTRACT_ENGINE
+
+    if engine == "cdp":
+        logger.info(f"Get page data for url: {url}")
+        sb.get(url)
+        sb.cdp.sleep(random.uniform(0.5, 0.9))
+        try:
+            return extract_data_page_with_cdp(sb)
+        except Exception as e:
+            logger.info(f"CDP extractor failed, fallback to BeautifulSoup: {e}")
+        return extract_data_page_with_soup(sb.cdp.get_page_source())
+
+    page_source = get_page_source(sb, url)
+
+    if engine == "scan":
+        try:
+            with metrics.span("gb_stage_seconds", stage="scan"):
+                return extract_data_page_with_scan(page_source)
+        except CrwlError as e:
+            logger.info(f"Scan extractor failed, fallback to BeautifulSoup: {e}")
+
+    with metrics.span("gb_stage_seconds", stage="beautifulsoup"):
+        return extract_data_page_with_soup(page_source)
+
+
+def find_page_param(url: str) -> tuple[str, int] | None:
+    # Paginators may be renamed (e.g. ``items_page``), any key ending in "page"
+    for key, value in parse_qsl(urlsplit(url).query):
+        if key.endswith("page") and value.isdigit():
+            return key, int(value)
+    return None
+
+
+def page_url(url: str, page: int, next_page_url: str | None = None) -> str:
+    page_param = "page"
+
+    # The next page url tells the paginator name
+    found = find_page_param(next_page_url) if next_page_url else None
+    if found is not None:
+        page_param = found[0]
 
-    return PageData.model_validate_json(str(page_data))
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != page_param]
+    query.append((page_param, str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
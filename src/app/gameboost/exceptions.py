@@ -1,2 +1,6 @@
 class CrwlError(Exception):
     pass
+
+
+class ChallengeError(CrwlError):
+    pass
@@ -0,0 +1,130 @@
+import threading
+from typing import Literal
+from urllib.parse import urlsplit
+
+import requests
+from pydantic_core import from_json
+from requests.adapters import HTTPAdapter
+
+from .exceptions import ChallengeError, CrwlError
+from .parsers import extract_data_page_with_scan, extract_data_page_with_soup
+from . import logger
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36"
+)
+CHALLENGE_STATUS_CODES = (403, 429, 503)
+CHALLENGE_MARKERS = (
+    "cf-chl",
+    "challenge-platform",
+    "cf_chl_opt",
+    "<title>Just a moment",
+)
+
+
+class InertiaClient:
+    def __init__(
+        self,
+        mode: Literal["json", "html"] = "json",
+        timeout: float = 20,
+        pool_size: int = 10,
+    ) -> None:
+        self.mode = mode
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {
+                "User-Agent": USER_AGENT,
+                "Accept-Language": "en",
+            }
+        )
+
+        # Inertia asset version per host, required for JSON responses
+        self._versions: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _raise_for_challenge(self, response: requests.Response) -> None:
+        if response.status_code in CHALLENGE_STATUS_CODES or any(
+            marker in response.text[:20000] for marker in CHALLENGE_MARKERS
+        ):
+            raise ChallengeError(
+                f"Challenge page detected: {response.url} ({response.status_code})"
+            )
+
+    def _remember_version(self, host: str, page_data: str) -> None:
+        try:
+            version = from_json(page_data).get("version", None)
+        except ValueError:
+            return
+
+        if version is not None:
+            with self._lock:
+                self._versions[host] = str(version)
+
+    def fetch_json(self, url: str) -> str | None:
+        host = urlsplit(url).netloc
+        with self._lock:
+            version = self._versions.get(host, None)
+
+        if version is None:
+            return None
+
+        response = self.session.get(
+            url,
+            headers={
+                "X-Inertia": "true",
+                "X-Inertia-Version": version,
+                "X-Requested-With": "XMLHttpRequest",
+                "Accept": "text/html, application/xhtml+xml",
+            },
+            timeout=self.timeout,
+        )
+
+        # 409 means the asset version changed, a full page visit refreshes it
+        if response.status_code == 409:
+            logger.info(f"Inertia version changed for host: {host}")
+            with self._lock:
+                self._versions.pop(host, None)
+            return None
+
+        self._raise_for_challenge(response)
+        response.raise_for_status()
+
+        if response.headers.get("X-Inertia", "").lower() != "true":
+            return None
+
+        return response.text
+
+    def fetch_html(self, url: str) -> str:
+        response = self.session.get(
+            url,
+            headers={"Accept": "text/html,application/xhtml+xml"},
+            timeout=self.timeout,
+        )
+        self._raise_for_challenge(response)
+        response.raise_for_status()
+
+        try:
+            page_data = extract_data_page_with_scan(response.text)
+        except CrwlError:
+            page_data = extract_data_page_with_soup(response.text)
+
+        self._remember_version(urlsplit(url).netloc, page_data)
+        return page_data
+
+    def fetch(self, url: str) -> str:
+        logger.info(f"Get page data over HTTP for url: {url}")
+        if self.mode == "json":
+            page_data = self.fetch_json(url)
+            if page_data is not None:
+                return page_data
+
+        return self.fetch_html(url)
+
+    def close(self) -> None:
+        self.session.close()
@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+from typing import Final, NotRequired, TypedDict
+
+from pydantic import BaseModel, TypeAdapter
+
+from .exceptions import CrwlError
 
 
 class SellerRating(BaseModel):
@@ -40,6 +44,8 @@ class Offer(BaseModel):
 
 class CurrentPageData(BaseModel):
     current_page: int
+    last_page: int | None = None
+    next_page_url: str | None = None
     data: list[Offer]
 
 
@@ -58,3 +64,236 @@ class Props(BaseModel):
 
 class PageData(BaseModel):
     props: Props
+
+
+OFFER_GROUPS: Final[tuple[tuple[str, str], ...]] = (
+    ("currency_offer", "currencies"),
+    ("account_offer", "accounts"),
+    ("item_offer", "items"),
+)
+
+
+class LeanOffer:
+    __slots__ = (
+        "id",
+        "seller_id",
+        "seller_name",
+        "rating",
+        "total_ratings",
+        "price",
+        "local_price",
+        "stock",
+        "min_quantity",
+        "delivery_seconds",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        seller_id: int,
+        seller_name: str,
+        rating: float,
+        total_ratings: int,
+        price: float,
+        local_price: float,
+        stock: int | None,
+        min_quantity: int | None,
+        delivery_seconds: int,
+    ) -> None:
+        self.id = id
+        self.seller_id = seller_id
+        self.seller_name = seller_name
+        self.rating = rating
+        self.total_ratings = total_ratings
+        self.price = price
+        self.local_price = local_price
+        self.stock = stock
+        self.min_quantity = min_quantity
+        self.delivery_seconds = delivery_seconds
+
+    def __repr__(self) -> str:
+        return (
+            f"LeanOffer(id={self.id}, seller_name={self.seller_name!r}, "
+            f"price={self.price}, local_price={self.local_price}, "
+            f"rating={self.rating}, total_ratings={self.total_ratings}, "
+            f"stock={self.stock}, min_quantity={self.min_quantity}, "
+            f"delivery_seconds={self.delivery_seconds})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LeanOffer):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    @classmethod
+    def from_offer(cls, offer: Offer) -> "LeanOffer":
+        return cls(
+            id=offer.id,
+            seller_id=offer.seller.id,
+            seller_name=offer.seller.username,
+            rating=offer.seller.rating.value,
+            total_ratings=offer.seller.total_ratings,
+            price=offer.price.amount,
+            local_price=offer.local_price.amount,
+            stock=offer.stock,
+            min_quantity=offer.min_quantity,
+            delivery_seconds=offer.delivery_time.seconds,
+        )
+
+    @classmethod
+    def from_dict(cls, offer: "LeanOfferData") -> "LeanOffer":
+        # Already typed by ``lean_payload_adapter``
+        seller = offer["seller"]
+        return cls(
+            id=offer["id"],
+            seller_id=seller["id"],
+            seller_name=seller["username"],
+            rating=seller["rating"]["value"],
+            total_ratings=seller["total_ratings"],
+            price=offer["price"]["amount"],
+            local_price=offer["local_price"]["amount"],
+            stock=offer.get("stock", None),
+            min_quantity=offer.get("min_quantity", None),
+            delivery_seconds=offer["delivery_time"]["seconds"],
+        )
+
+
+class LeanPage:
+    __slots__ = ("offers", "current_page", "last_page", "next_page_url", "digest")
+
+    def __init__(
+        self,
+        offers: list[LeanOffer],
+        current_page: int = 1,
+        last_page: int = 1,
+        next_page_url: str | None = None,
+        digest: str = "",
+    ) -> None:
+        self.offers = offers
+        self.current_page = current_page
+        self.last_page = last_page
+        self.next_page_url = next_page_url
+        # Hash of the raw payload the page was decoded from
+        self.digest = digest
+
+    def add_pagination(
+        self,
+        current_page: int,
+        last_page: int | None,
+        next_page_url: str | None,
+    ) -> None:
+        # Listings of one product share the page number, keep the longest one
+        self.current_page = current_page
+        if last_page is not None and last_page > self.last_page:
+            self.last_page = last_page
+        if self.next_page_url is None:
+            self.next_page_url = next_page_url
+
+    @classmethod
+    def from_page_data(cls, page_data: PageData, offers: list[Offer]) -> "LeanPage":
+        page = cls(offers=[LeanOffer.from_offer(offer) for offer in offers])
+        model = page_data.props.model
+        for _, page_key in OFFER_GROUPS:
+            current_page: CurrentPageData | None = getattr(model, page_key)
+            if current_page:
+                page.add_pagination(
+                    current_page=current_page.current_page,
+                    last_page=current_page.last_page,
+                    next_page_url=current_page.next_page_url,
+                )
+        return page
+
+
+# Only the fields read by ``LeanOffer``, the rest of the payload is skipped
+# by the JSON parser instead of being built into Python objects
+class LeanRatingData(TypedDict):
+    value: float
+
+
+class LeanSellerData(TypedDict):
+    id: int
+    username: str
+    rating: LeanRatingData
+    total_ratings: int
+
+
+class LeanAmountData(TypedDict):
+    amount: float
+
+
+class LeanDeliveryData(TypedDict):
+    seconds: int
+
+
+class LeanOfferData(TypedDict):
+    id: int
+    seller: LeanSellerData
+    price: LeanAmountData
+    local_price: LeanAmountData
+    stock: NotRequired[int | None]
+    min_quantity: NotRequired[int | None]
+    delivery_time: LeanDeliveryData
+
+
+class LeanPageData(TypedDict):
+    current_page: int
+    last_page: NotRequired[int | None]
+    next_page_url: NotRequired[str | None]
+    data: list[LeanOfferData]
+
+
+class LeanModelData(TypedDict, total=False):
+    currency_offer: LeanOfferData | None
+    currencies: LeanPageData | None
+    item_offer: LeanOfferData | None
+    items: LeanPageData | None
+    account_offer: LeanOfferData | None
+    accounts: LeanPageData | None
+
+
+class LeanPropsData(TypedDict):
+    model: LeanModelData
+
+
+class LeanPayloadData(TypedDict):
+    props: LeanPropsData
+
+
+lean_payload_adapter: Final = TypeAdapter(LeanPayloadData)
+
+
+def parse_lean_payload(page_data: str | bytes) -> LeanPayloadData:
+    return lean_payload_adapter.validate_json(page_data)
+
+
+def decode_lean_page(page_data: str | bytes) -> LeanPage:
+    # Same order as ``processes.platten_offer``, the first of equal prices wins
+    try:
+        model = parse_lean_payload(page_data)["props"]["model"]
+
+        page = LeanPage(offers=[])
+        for offer_key, page_key in OFFER_GROUPS:
+            offer = model.get(offer_key, None)
+            if offer:
+                page.offers.append(LeanOffer.from_dict(offer))
+
+            current_page = model.get(page_key, None)
+            if current_page:
+                page.offers.extend(LeanOffer.from_dict(o) for o in current_page["data"])
+                page.add_pagination(
+                    current_page=current_page["current_page"],
+                    last_page=current_page.get("last_page", None),
+                    next_page_url=current_page.get("next_page_url", None),
+                )
+
+        return page
+
+    # ``ValidationError`` is a ``ValueError``
+    except (KeyError, TypeError, ValueError) as e:
+        raise CrwlError(f"Invalid page data: {e!r}") from e
+
+
+def decode_lean_offers(page_data: str | bytes) -> list[LeanOffer]:
+    return decode_lean_page(page_data).offers
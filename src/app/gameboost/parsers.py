@@ -0,0 +1,113 @@
+import html
+import re
+
+from bs4 import BeautifulSoup
+
+from .exceptions import CrwlError
+
+APP_ID_PATTERN = re.compile(r"""(?<=\s)id\s*=\s*(?:"app"|'app'|app(?=[\s/>]))""")
+TAG_PATTERN = re.compile(
+    r"""<[a-zA-Z][\w-]*"""
+    r"""((?:\s+[^\s=/>]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'=<>`]+))?)*)\s*/?>"""
+)
+UNCOMMON_ENTITY_PATTERN = re.compile(r"&(?!quot;|amp;|lt;|gt;|#039;|#39;|apos;)")
+COMMON_ENTITIES = (
+    ("&quot;", '"'),
+    ("&#039;", "'"),
+    ("&#39;", "'"),
+    ("&apos;", "'"),
+    ("&lt;", "<"),
+    ("&gt;", ">"),
+    ("&amp;", "&"),
+)
+# Regions where an ``id="app"`` is only text: comments and raw text elements
+SKIP_START_PATTERN = re.compile(
+    r"<!--|<(script|style|textarea|title)(?=[\s/>])", re.IGNORECASE
+)
+SKIP_END_PATTERNS = {
+    tag: re.compile(rf"</{tag}\s*>", re.IGNORECASE)
+    for tag in ("script", "style", "textarea", "title")
+}
+ATTR_PATTERN = re.compile(
+    r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?"""
+)
+
+
+def extract_data_page_with_soup(page_source: str) -> str:
+    soup = BeautifulSoup(page_source, "html.parser")
+    app_tag = soup.select_one("#app")
+
+    if not app_tag:
+        raise CrwlError("App tag not found!!!")
+
+    page_data = app_tag.attrs.get("data-page", None)
+    if not page_data:
+        raise CrwlError("Page data not found!!!")
+
+    return str(page_data)
+
+
+def _tag_attrs(attrs_source: str) -> dict[str, str]:
+    attrs = {}
+    for match in ATTR_PATTERN.finditer(attrs_source):
+        name, double_quoted, single_quoted, unquoted = match.groups()
+        value = next(
+            (v for v in (double_quoted, single_quoted, unquoted) if v is not None), ""
+        )
+        attrs.setdefault(name.lower(), value)
+    return attrs
+
+
+def unescape_attr(value: str) -> str:
+    # ``html.unescape`` calls back into Python for every entity, which is slow
+    # on a JSON payload full of ``&quot;``; plain replaces cover what servers emit
+    if UNCOMMON_ENTITY_PATTERN.search(value):
+        return html.unescape(value)
+
+    for entity, char in COMMON_ENTITIES:
+        value = value.replace(entity, char)
+    return value
+
+
+def _skip_region_end(page_source: str, skip_match: re.Match) -> int:
+    tag = skip_match.group(1)
+    if tag is None:
+        end = page_source.find("-->", skip_match.end())
+        return len(page_source) if end == -1 else end + 3
+
+    end_match = SKIP_END_PATTERNS[tag.lower()].search(page_source, skip_match.end())
+    return len(page_source) if end_match is None else end_match.end()
+
+
+def extract_data_page_with_scan(page_source: str) -> str:
+    # Only the opening tag of ``#app`` is parsed, the rest of the page is skipped
+    # but for the comments and raw text elements before it, scanned once
+    scanned = 0
+    skip_end = 0
+    for id_match in APP_ID_PATTERN.finditer(page_source):
+        tag_start = page_source.rfind("<", 0, id_match.start())
+        if tag_start == -1:
+            continue
+
+        while scanned < tag_start:
+            skip_match = SKIP_START_PATTERN.search(page_source, scanned, tag_start)
+            if skip_match is None:
+                scanned = tag_start
+                break
+            skip_end = scanned = _skip_region_end(page_source, skip_match)
+        if tag_start < skip_end:
+            continue
+
+        tag_match = TAG_PATTERN.match(page_source, tag_start)
+        if not tag_match or tag_match.end() < id_match.end():
+            continue
+
+        attrs = _tag_attrs(tag_match.group(1))
+        if attrs.get("id") != "app":
+            continue
+
+        page_data = attrs.get("data-page", None)
+        if page_data:
+            return unescape_attr(page_data)
+
+    raise CrwlError("Page data not found!!!")
@@ -0,0 +1,25 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    def __init__(self, min_interval: float) -> None:
+        self.min_interval = min_interval
+
+        self._next_slots: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        if self.min_interval <= 0:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slots.get(host, now))
+            self._next_slots[host] = slot + self.min_interval
+
+        # Sleep outside the lock, the slot is already reserved for this caller
+        if slot > now:
+            time.sleep(slot - now)
@@ -0,0 +1,239 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Self
+
+from .gameboost.models import LeanOffer
+from .paths import ROOT_PATH
+from .sheet.blacklist import blacklist_cache
+from .sheet.models import RowRun
+from . import config, logger
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS snapshots ("
+    "id INTEGER PRIMARY KEY, url TEXT NOT NULL, observed_at REAL NOT NULL, "
+    "digest TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS snapshots_url ON snapshots (url, observed_at)",
+    "CREATE TABLE IF NOT EXISTS offers ("
+    "snapshot_id INTEGER NOT NULL, seller_id INTEGER, seller_name TEXT, "
+    "price REAL, local_price REAL, stock INTEGER, rating REAL, "
+    "total_ratings INTEGER, min_quantity INTEGER, delivery_seconds INTEGER)",
+    "CREATE INDEX IF NOT EXISTS offers_snapshot ON offers (snapshot_id, price)",
+)
+
+OfferRow = tuple[int, str, float, float, int | None, float, int, int | None, int]
+
+
+class PricePoint:
+    __slots__ = ("observed_at", "seller_name", "price", "local_price")
+
+    def __init__(
+        self, observed_at: float, seller_name: str, price: float, local_price: float
+    ) -> None:
+        self.observed_at = observed_at
+        self.seller_name = seller_name
+        self.price = price
+        self.local_price = local_price
+
+    def __repr__(self) -> str:
+        return (
+            f"PricePoint(observed_at={self.observed_at}, "
+            f"seller_name={self.seller_name!r}, price={self.price})"
+        )
+
+
+class PriceHistoryStore:
+    # Append-only offer snapshots. A snapshot is only stored when the payload
+    # digest of the url changed, it stands until the next one
+    def __init__(self, path: str, batch_size: int, flush_interval: float) -> None:
+        self.path = ROOT_PATH.joinpath(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: list[tuple[str, float, str, list[OfferRow]]] = []
+        self._pending_offers = 0
+        self._last_digests: dict[str, str] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            self._last_digests = dict(
+                conn.execute(
+                    "SELECT url, digest FROM snapshots "
+                    "WHERE id IN (SELECT MAX(id) FROM snapshots GROUP BY url)"
+                ).fetchall()
+            )
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def start(self) -> None:
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="price-history", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def record(self, url: str, digest: str, offers: list[LeanOffer]) -> None:
+        # Called on the crawl thread, only copies the offer fields
+        with self._condition:
+            if self._last_digests.get(url) == digest:
+                return
+            self._last_digests[url] = digest
+
+            rows = [
+                (
+                    offer.seller_id,
+                    offer.seller_name,
+                    offer.price,
+                    offer.local_price,
+                    offer.stock,
+                    offer.rating,
+                    offer.total_ratings,
+                    offer.min_quantity,
+                    offer.delivery_seconds,
+                )
+                for offer in offers
+            ]
+            self._pending.append((url, time.time(), digest, rows))
+            self._pending_offers += len(rows)
+            if self._pending_offers >= self.batch_size:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            with self._condition:
+                while (
+                    not self._closed
+                    and self._pending_offers < self.batch_size
+                    and time.monotonic() - last_flush < self.flush_interval
+                ):
+                    self._condition.wait(
+                        self.flush_interval - (time.monotonic() - last_flush)
+                    )
+
+                closed = self._closed
+                pending, self._pending = self._pending, []
+                self._pending_offers = 0
+
+            self._flush(pending)
+            last_flush = time.monotonic()
+            if closed:
+                return
+
+    def _flush(self, pending: list[tuple[str, float, str, list[OfferRow]]]) -> None:
+        if not pending:
+            return
+
+        try:
+            with self._connect() as conn:
+                for url, observed_at, digest, rows in pending:
+                    cursor = conn.execute(
+                        "INSERT INTO snapshots (url, observed_at, digest) "
+                        "VALUES (?, ?, ?)",
+                        (url, observed_at, digest),
+                    )
+                    conn.executemany(
+                        "INSERT INTO offers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(cursor.lastrowid, *row) for row in rows],
+                    )
+        except Exception as e:
+            logger.exception(f"Price history flush failed: {e}")
+            with self._condition:
+                # Forget the digests so the next round records them again
+                for url, _, digest, _ in pending:
+                    if self._last_digests.get(url) == digest:
+                        self._last_digests.pop(url, None)
+
+    def lowest_valid_prices(
+        self,
+        url: str,
+        run_row: RowRun | None = None,
+        blacklist: frozenset[str] = frozenset(),
+        since: float | None = None,
+        until: float | None = None,
+    ) -> list[PricePoint]:
+        # Same thresholds as ``processes.is_valid_offer``, one point per snapshot
+        conditions = ["s.url = ?"]
+        params: list = [url]
+        if since is not None:
+            conditions.append("s.observed_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("s.observed_at < ?")
+            params.append(until)
+        if run_row is not None:
+            conditions += [
+                "o.total_ratings >= ?",
+                "o.rating >= ?",
+                "o.delivery_seconds / 60 <= ?",
+                "(o.min_quantity IS NULL OR o.min_quantity = 0 OR o.min_quantity <= ?)",
+                "(o.stock IS NULL OR o.stock = 0 OR o.stock >= ?)",
+            ]
+            params += [
+                run_row.FEEDBACK_QTY,
+                run_row.FEEDBACK_PERCENT,
+                run_row.DELIVERY_TIME,
+                run_row.MIN_QTY,
+                run_row.STOCK1,
+            ]
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT s.id, s.observed_at, o.seller_name, o.price, o.local_price "
+                "FROM snapshots s JOIN offers o ON o.snapshot_id = s.id "
+                f"WHERE {' AND '.join(conditions)} "
+                "ORDER BY s.observed_at, s.id, o.price",
+                params,
+            ).fetchall()
+
+        points: list[PricePoint] = []
+        last_snapshot = None
+        for snapshot_id, observed_at, seller_name, price, local_price in rows:
+            if snapshot_id == last_snapshot:
+                continue
+            if blacklist_cache.normalize(seller_name) in blacklist:
+                continue
+            last_snapshot = snapshot_id
+            points.append(PricePoint(observed_at, seller_name, price, local_price))
+
+        return points
+
+
+price_history: PriceHistoryStore | None = (
+    PriceHistoryStore(
+        path=config.PRICE_HISTORY_PATH,
+        batch_size=config.PRICE_HISTORY_BATCH_SIZE,
+        flush_interval=config.PRICE_HISTORY_FLUSH_INTERVAL,
+    )
+    if config.PRICE_HISTORY_PATH
+    else None
+)
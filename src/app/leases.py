@@ -0,0 +1,197 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from .paths import ROOT_PATH
+from . import logger
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Lease:
+    # A claimed key, renewed in the background until it is completed or
+    # released. Either may run on another thread than the claim
+    def __init__(self, queue: "LeaseQueue", key: str) -> None:
+        self.queue = queue
+        self.key = key
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._renewer = threading.Thread(
+            target=self._keep_alive, name=f"lease-{key[:32]}", daemon=True
+        )
+        self._renewer.start()
+
+    def _keep_alive(self) -> None:
+        while not self._stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.renew(self.key):
+                logger.info(f"Lease lost: {self.key}")
+                return
+
+    def _finish(self) -> bool:
+        with self._lock:
+            if self._stop.is_set():
+                return False
+            self._stop.set()
+        self._renewer.join()
+        return True
+
+    def complete(self) -> None:
+        # The group was written, other workers wait ``repeat_after``
+        if self._finish():
+            self.queue.complete(self.key)
+
+    def release(self) -> None:
+        # Nothing was written, let any worker retry right away
+        if self._finish():
+            self.queue.release(self.key)
+
+
+class LeaseQueue(ABC):
+    # Work items are claimed with an expiring lease, a dead worker's items are
+    # claimable again once the lease runs out. Backends implement the four
+    # primitives, ``acquire`` is shared
+    def __init__(
+        self, worker_id: str, lease_seconds: float, repeat_after: float
+    ) -> None:
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.repeat_after = repeat_after
+
+    @abstractmethod
+    def claim(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def renew(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def complete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def release(self, key: str) -> None: ...
+
+    def acquire(self, key: str) -> Lease | None:
+        if not self.claim(key):
+            return None
+        return Lease(self, key)
+
+
+class SQLiteLeaseQueue(LeaseQueue):
+    def __init__(
+        self,
+        path: str,
+        worker_id: str,
+        lease_seconds: float,
+        repeat_after: float,
+    ) -> None:
+        super().__init__(worker_id, lease_seconds, repeat_after)
+        self.path = ROOT_PATH.joinpath(path)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "key TEXT PRIMARY KEY, owner TEXT, lease_until REAL NOT NULL, "
+                "done_at REAL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # A connection per operation keeps the queue safe across threads
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def claim(self, key: str) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            # Take the write lock before reading so two workers cannot both win
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT owner, lease_until, done_at FROM leases WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    owner, lease_until, done_at = row
+                    if owner not in (None, self.worker_id) and lease_until > now:
+                        conn.execute("ROLLBACK")
+                        return False
+                    # A completed key keeps its owner: the worker that wrote it
+                    # follows its own schedule, the others wait ``repeat_after``
+                    if (
+                        done_at is not None
+                        and owner != self.worker_id
+                        and now - done_at < self.repeat_after
+                    ):
+                        conn.execute("ROLLBACK")
+                        return False
+
+                conn.execute(
+                    "INSERT INTO leases (key, owner, lease_until) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET "
+                    "owner = excluded.owner, lease_until = excluded.lease_until",
+                    (key, self.worker_id, now + self.lease_seconds),
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def renew(self, key: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE leases SET lease_until = ? WHERE key = ? AND owner = ?",
+                (time.time() + self.lease_seconds, key, self.worker_id),
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE leases SET lease_until = 0, done_at = ? "
+                "WHERE key = ? AND owner = ?",
+                (time.time(), key, self.worker_id),
+            )
+
+    def release(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE leases SET owner = NULL, lease_until = 0 "
+                "WHERE key = ? AND owner = ?",
+                (key, self.worker_id),
+            )
+
+
+LEASE_BACKENDS: dict[str, type[SQLiteLeaseQueue]] = {
+    "sqlite": SQLiteLeaseQueue,
+}
+
+
+def create_lease_queue(
+    backend: str,
+    path: str,
+    worker_id: str,
+    lease_seconds: float,
+    repeat_after: float,
+) -> LeaseQueue | None:
+    if backend == "none":
+        return None
+
+    worker_id = worker_id or default_worker_id()
+    logger.info(f"Coordinate rows through {backend} leases as {worker_id}")
+    return LEASE_BACKENDS[backend](
+        path=path,
+        worker_id=worker_id,
+        lease_seconds=lease_seconds,
+        repeat_after=repeat_after,
+    )
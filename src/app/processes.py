@@ -1,21 +1,58 @@
+import hashlib
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import batched
 
 
 from typing import Final
 
+import numpy as np
 from pydantic import ValidationError
 
 from app import config
 
-from .gameboost.crwl import extract_page_data
-from .gameboost.models import Offer, PageData
+from .gameboost.crwl import extract_raw_page_data, gameboost_breaker, page_url
+from .gameboost.exceptions import ChallengeError
+from .gameboost.models import LeanOffer, LeanPage, Offer, PageData, decode_lean_page
+from .history import price_history
+from .leases import Lease, LeaseQueue
+from .sheet.blacklist import blacklist_cache
+from .sheet.g_sheet import sheets_breaker
+from .sheet.governor import sheets_governor
 from .sheet.models import RowRun
+from .sheet.writer import SheetWriter
 from . import logger
-from .shared.decorators import retry_on_fail
+from .shared.breaker import CircuitOpenError
+from .shared.log import log_context
+from .shared.lru import LRUCache
+from .shared.metrics import metrics
 from .utils import sleep_for
 
 DEFAULT_RELAX_TIME: Final[float] = 5
 
+# One line per evaluated row, level and sampling set by LOG_OFFER_*
+offer_logger = logging.getLogger(f"{logger.name}.offers")
+
+RowTask = tuple[int, RowRun | None]
+# Rows of a group, every offer of the product and the payload digest
+FetchedGroup = tuple[list[RowRun], list[LeanOffer], str]
+
+# (url, raw payload hash) -> decoded page
+page_cache: LRUCache[LeanPage] = LRUCache(maxsize=config.PAGE_CACHE_SIZE)
+# row index -> ((content hash, evaluation inputs), evaluation) of the last
+# written result
+row_result_cache: LRUCache[tuple[tuple, "OfferEvaluation"]] = LRUCache(
+    maxsize=config.PAGE_CACHE_SIZE * 4
+)
+
+page_executor = ThreadPoolExecutor(
+    max_workers=max(config.PAGE_FETCH_CONCURRENCY, 1),
+    thread_name_prefix="page-fetch",
+)
+
 
 def platten_offer(page_data: PageData) -> list[Offer]:
     offers: list[Offer] = []
@@ -43,21 +80,130 @@ def platten_offer(page_data: PageData) -> list[Offer]:
     return offers
 
 
+def decode_page(page_data: str) -> LeanPage:
+    if config.OFFER_DECODER == "lean":
+        with metrics.span("gb_stage_seconds", stage="decode_lean_page"):
+            return decode_lean_page(page_data)
+
+    with metrics.span("gb_stage_seconds", stage="model_validate_json"):
+        model = PageData.model_validate_json(page_data)
+    return LeanPage.from_page_data(model, platten_offer(model))
+
+
+def get_page(sb, url: str) -> LeanPage:
+    with log_context(url=url):
+        page_data = extract_raw_page_data(sb, url)
+    digest = hashlib.blake2b(page_data.encode(), digest_size=16).hexdigest()
+
+    page = page_cache.get((url, digest))
+    if page is not None:
+        return page
+
+    page = decode_page(page_data)
+    page.digest = digest
+    page_cache.put((url, digest), page)
+    return page
+
+
+def fetch_pages(sb, urls: list[str]) -> list[LeanPage]:
+    # A browser has a single tab, the other backends fetch concurrently
+    if config.FETCH_BACKEND == "browser" or len(urls) == 1:
+        return [get_page(sb, url) for url in urls]
+
+    futures = [page_executor.submit(get_page, None, url) for url in urls]
+    pages: list[LeanPage] = []
+    for url, future in zip(urls, futures):
+        try:
+            pages.append(future.result())
+        except ChallengeError:
+            pages.append(get_page(sb, url))
+
+    return pages
+
+
+def can_stop_paging(
+    offers: list[LeanOffer],
+    run_rows: list[RowRun],
+    last_page: LeanPage,
+) -> bool:
+    # Listings are sorted by price: once our offer is found and the last page
+    # only has offers above every row's best valid one, later pages change
+    # neither the lowest valid offer nor our top
+    if not last_page.offers:
+        return True
+
+    if not any(offer.seller_name == config.OUR_SELLER_NAME for offer in offers):
+        return False
+
+    blacklists: list[frozenset[str]] = []
+    for run_row in run_rows:
+        try:
+            blacklists.append(run_row.get_blacklist())
+        except Exception as e:
+            # Reported on its own row at evaluation, keep paging meanwhile
+            logger.info("Can't check row %s for early stop: %s", run_row.index, e)
+            return False
+
+    page_min_price = min(offer.price for offer in last_page.offers)
+    for evaluation in OfferColumns(offers).evaluate_many(run_rows, blacklists):
+        if evaluation.min_offer is None:
+            return False
+        if evaluation.min_offer.price >= page_min_price:
+            return False
+
+    return True
+
+
+def collect_offers(sb, url: str, run_rows: list[RowRun]) -> tuple[list[LeanOffer], str]:
+    first_page = get_page(sb, url)
+    # Copied, pages are shared with ``page_cache``
+    offers = list(first_page.offers)
+    seen_ids = {offer.id for offer in offers}
+    digests = [first_page.digest]
+
+    last_page = min(first_page.last_page, config.MAX_OFFER_PAGES)
+    page_numbers = range(first_page.current_page + 1, last_page + 1)
+    if not page_numbers:
+        return offers, first_page.digest
+
+    wave_size = (
+        max(config.PAGE_FETCH_CONCURRENCY, 1)
+        if config.FETCH_BACKEND != "browser"
+        else 1
+    )
+    page = first_page
+    for wave in batched(page_numbers, wave_size):
+        if can_stop_paging(offers, run_rows, page):
+            logger.info(f"Stop paging before page {wave[0]} of {last_page}")
+            break
+
+        urls = [page_url(url, number, first_page.next_page_url) for number in wave]
+        for page in fetch_pages(sb, urls):
+            digests.append(page.digest)
+            # Pinned offers are repeated on every page
+            for offer in page.offers:
+                if offer.id not in seen_ids:
+                    seen_ids.add(offer.id)
+                    offers.append(offer)
+
+    return offers, ":".join(digests)
+
+
 def is_valid_offer(
-    offer: Offer,
+    offer: LeanOffer,
     run_row: RowRun,
-    blacklist: list[str],
+    blacklist: frozenset[str],
 ) -> bool:
-    if offer.seller.username in blacklist:
+    if blacklist_cache.normalize(offer.seller_name) in blacklist:
         return False
 
-    if offer.seller.total_ratings < run_row.FEEDBACK_QTY:
+    if offer.total_ratings < run_row.FEEDBACK_QTY:
         return False
 
-    if offer.seller.rating.value < run_row.FEEDBACK_PERCENT:
+    if offer.rating < run_row.FEEDBACK_PERCENT:
         return False
 
-    if offer.delivery_time.seconds // 60 > run_row.DELIVERY_TIME:
+    if offer.delivery_seconds // 60 > run_row.DELIVERY_TIME:
         return False
 
     if offer.min_quantity and offer.min_quantity > run_row.MIN_QTY:
@@ -69,16 +215,17 @@ def is_valid_offer(
     return True
 
 
+@metrics.timed("gb_stage_seconds", stage="filter_offers_and_our_offer")
 def filter_offers_and_our_offer(
-    offers: list[Offer],
+    offers: list[LeanOffer],
     run_row: RowRun,
-) -> tuple[list[Offer], Offer | None]:
-    blacklist: list[str] = run_row.get_blacklist()
-    valid_offers: list[Offer] = []
-    my_offer: Offer | None = None
+) -> tuple[list[LeanOffer], LeanOffer | None]:
+    blacklist: frozenset[str] = run_row.get_blacklist()
+    valid_offers: list[LeanOffer] = []
+    my_offer: LeanOffer | None = None
 
     for offer in offers:
-        if offer.seller.username == config.OUR_SELLER_NAME:
+        if offer.seller_name == config.OUR_SELLER_NAME:
             my_offer = offer
 
         if is_valid_offer(offer=offer, run_row=run_row, blacklist=blacklist):
@@ -87,30 +234,26 @@ def filter_offers_and_our_offer(
     return valid_offers, my_offer
 
 
+@metrics.timed("gb_stage_seconds", stage="find_min_valid_offer")
 def find_min_valid_offer(
-    valid_offers: list[Offer],
-) -> Offer:
-    min_offer: Offer = valid_offers[0]
+    valid_offers: list[LeanOffer],
+) -> LeanOffer:
+    min_offer: LeanOffer = valid_offers[0]
     for offer in valid_offers:
-        if offer.price.amount < min_offer.price.amount:
+        if offer.price < min_offer.price:
             min_offer = offer
 
     return min_offer
 
 
-def __get_offer_price(
-    offer: Offer,
-) -> float:
-    return offer.price.amount
-
-
+@metrics.timed("gb_stage_seconds", stage="find_my_offer_top")
 def find_my_offer_top(
-    offers: list[Offer],
+    offers: list[LeanOffer],
 ) -> int:
-    sorted_offers = sorted(offers, key=lambda x: __get_offer_price(x))
+    sorted_offers = sorted(offers, key=lambda x: x.price)
 
     for i, offer in enumerate(sorted_offers):
-        if offer.seller.username == config.OUR_SELLER_NAME:
+        if offer.seller_name == config.OUR_SELLER_NAME:
             return i + 1
 
     return -1
@@ -123,74 +266,557 @@ def last_update_message(
     return formatted_date
 
 
-@retry_on_fail(max_retries=3, sleep_interval=1)
-def run(sb, index: int) -> None:
-    try:
-        logger.info(f"Processing row: {index}")
-        run_row = RowRun.get(
-            sheet_id=config.SPREADSHEET_KEY, sheet_name=config.SHEET_NAME, index=index
+def update_note_message(
+    index: int,
+    messages: str,
+    writer: SheetWriter | None = None,
+) -> None:
+    if writer:
+        writer.put_note(index, messages)
+        return
+
+    RowRun.update_note_message(
+        sheet_id=config.SPREADSHEET_KEY,
+        sheet_name=config.SHEET_NAME,
+        index=index,
+        messages=messages,
+    )
+
+
+def group_run_rows(
+    run_rows: dict[int, RowRun | None],
+) -> list[list[RowTask]]:
+    # Rows sharing a product URL are evaluated against a single fetch, rows
+    # without a snapshot are fetched on their own
+    groups: dict[str, list[RowTask]] = {}
+    single_groups: list[list[RowTask]] = []
+
+    for index, run_row in run_rows.items():
+        if run_row is None:
+            single_groups.append([(index, run_row)])
+        else:
+            groups.setdefault(run_row.PRODUCT_COMPARE, []).append((index, run_row))
+
+    return list(groups.values()) + single_groups
+
+
+def group_key(tasks: list[RowTask]) -> str:
+    index, run_row = tasks[0]
+    if run_row is None:
+        return f"{config.SHEET_NAME}:row:{index}"
+    return f"{config.SHEET_NAME}:{run_row.PRODUCT_COMPARE}"
+
+
+class OfferEvaluation:
+    __slots__ = ("valid_count", "min_offer", "my_offer", "my_top")
+
+    def __init__(
+        self,
+        valid_count: int,
+        min_offer: LeanOffer | None,
+        my_offer: LeanOffer | None,
+        my_top: int,
+    ) -> None:
+        self.valid_count = valid_count
+        self.min_offer = min_offer
+        self.my_offer = my_offer
+        self.my_top = my_top
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, OfferEvaluation):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
         )
 
-        page_data = extract_page_data(sb, run_row.PRODUCT_COMPARE)
 
-        offers = platten_offer(page_data)
+class OfferColumns:
+    # Offers loaded column-wise, so that any number of rows (threshold sets)
+    # are evaluated with one vectorized pass over the offers
+    __slots__ = (
+        "offers",
+        "price",
+        "rating",
+        "total_ratings",
+        "delivery_minutes",
+        "stock",
+        "min_quantity",
+        "seller_id",
+        "seller_codes",
+        "seller_names",
+        "is_ours",
+    )
+
+    def __init__(self, offers: list[LeanOffer]) -> None:
+        count = len(offers)
+        self.offers = offers
+        self.price = np.fromiter((o.price for o in offers), np.float64, count)
+        self.rating = np.fromiter((o.rating for o in offers), np.float64, count)
+        self.total_ratings = np.fromiter(
+            (o.total_ratings for o in offers), np.int64, count
+        )
+        self.delivery_minutes = (
+            np.fromiter((o.delivery_seconds for o in offers), np.int64, count) // 60
+        )
+        # None and 0 both disable the stock / min quantity checks
+        self.stock = np.fromiter((o.stock or 0 for o in offers), np.int64, count)
+        self.min_quantity = np.fromiter(
+            (o.min_quantity or 0 for o in offers), np.int64, count
+        )
+        self.seller_id = np.fromiter((o.seller_id for o in offers), np.int64, count)
 
-        valid_offers, my_offer = filter_offers_and_our_offer(offers, run_row)
+        names = [blacklist_cache.normalize(o.seller_name) for o in offers]
+        seller_names, seller_codes = np.unique(
+            np.array(names, dtype=object), return_inverse=True
+        )
+        self.seller_names: list[str] = seller_names.tolist()
+        self.seller_codes = seller_codes.reshape(-1)
+        self.is_ours = np.fromiter(
+            (o.seller_name == config.OUR_SELLER_NAME for o in offers), bool, count
+        )
 
-        run_row.Note = ""
+    def blacklist_mask(self, blacklist: frozenset[str]) -> np.ndarray:
+        blocked = np.fromiter(
+            (name in blacklist for name in self.seller_names),
+            bool,
+            len(self.seller_names),
+        )
+        return blocked[self.seller_codes]
+
+    def valid_masks(
+        self,
+        run_rows: list[RowRun],
+        blacklists: list[frozenset[str]],
+    ) -> np.ndarray:
+        def thresholds(name: str, dtype) -> np.ndarray:
+            return np.array([getattr(r, name) for r in run_rows], dtype)[:, None]
+
+        blocked: dict[frozenset[str], np.ndarray] = {}
+        blacklisted = np.stack(
+            [
+                blocked.setdefault(blacklist, self.blacklist_mask(blacklist))
+                for blacklist in blacklists
+            ]
+        )
 
-        if len(valid_offers) > 0:
-            min_offer = find_min_valid_offer(valid_offers)
-            logger.info(f"Min offer: {min_offer}")
-            run_row.SELLER = min_offer.seller.username
-            run_row.LOWEST_PRICE_EUR = str(min_offer.price.amount)
-            run_row.LOWEST_PRICE_USD = str(min_offer.local_price.amount)
+        return (
+            ~blacklisted
+            & (self.total_ratings >= thresholds("FEEDBACK_QTY", np.int64))
+            & (self.rating >= thresholds("FEEDBACK_PERCENT", np.float64))
+            & (self.delivery_minutes <= thresholds("DELIVERY_TIME", np.int64))
+            & (
+                (self.min_quantity == 0)
+                | (self.min_quantity <= thresholds("MIN_QTY", np.int64))
+            )
+            & ((self.stock == 0) | (self.stock >= thresholds("STOCK1", np.int64)))
+        )
 
-        else:
-            logger.info("No valid offer")
-            run_row.SELLER = ""
-            run_row.LOWEST_PRICE_EUR = ""
-            run_row.LOWEST_PRICE_USD = ""
-            run_row.Note = run_row.Note + "Không có seller hợp lệ \n"
-
-        if my_offer:
-            my_top = find_my_offer_top(offers)
-            logger.info(f"My offer at top {my_top}")
-            run_row.Top = str(my_top)
-            run_row.CNLGAMING_EUR = str(my_offer.price.amount)
-            run_row.CNLGAMING_USD = str(my_offer.local_price.amount)
+    def our_offer_and_top(self) -> tuple[LeanOffer | None, int]:
+        our_indexes = np.flatnonzero(self.is_ours)
+        if len(our_indexes) == 0:
+            return None, -1
+
+        # Same as the stable sort of ``find_my_offer_top``: count the cheaper
+        # offers and the equal ones listed before our cheapest offer
+        top_index = our_indexes[np.argmin(self.price[our_indexes])]
+        top_price = self.price[top_index]
+        my_top = (
+            int(np.count_nonzero(self.price < top_price))
+            + int(np.count_nonzero(self.price[:top_index] == top_price))
+            + 1
+        )
 
-        else:
-            logger.info("Can't find my offer")
-            run_row.Top = "NaN"
-            run_row.CNLGAMING_EUR = ""
-            run_row.CNLGAMING_USD = ""
-            run_row.Note = (
-                run_row.Note + f"Không tìm thấy seller {config.OUR_SELLER_NAME}"
+        # ``filter_offers_and_our_offer`` keeps the last of our offers
+        return self.offers[our_indexes[-1]], my_top
+
+    def evaluate_many(
+        self,
+        run_rows: list[RowRun],
+        blacklists: list[frozenset[str]],
+    ) -> list[OfferEvaluation]:
+        my_offer, my_top = self.our_offer_and_top()
+        if not run_rows:
+            return []
+
+        if not self.offers:
+            return [OfferEvaluation(0, None, my_offer, my_top) for _ in run_rows]
+
+        masks = self.valid_masks(run_rows, blacklists)
+        valid_counts = np.count_nonzero(masks, axis=1)
+        # argmin returns the first of equal prices, like ``find_min_valid_offer``
+        min_indexes = np.argmin(np.where(masks, self.price, np.inf), axis=1)
+
+        return [
+            OfferEvaluation(
+                valid_count=int(valid_count),
+                min_offer=self.offers[min_index] if valid_count else None,
+                my_offer=my_offer,
+                my_top=my_top,
             )
+            for valid_count, min_index in zip(valid_counts, min_indexes)
+        ]
 
-        run_row.Time_update = last_update_message(datetime.now())
-        run_row.update()
-        sleep_for(run_row.RELAX)
 
-    except ValidationError as e:
-        logger.exception(f"VALIDATION ERROR AT ROW: {index}")
-        logger.exception(e.errors())
-        RowRun.update_note_message(
-            sheet_id=config.SPREADSHEET_KEY,
-            sheet_name=config.SHEET_NAME,
+def evaluate_offers(
+    offers: list[LeanOffer],
+    run_row: RowRun,
+) -> OfferEvaluation:
+    valid_offers, my_offer = filter_offers_and_our_offer(offers, run_row)
+    return OfferEvaluation(
+        valid_count=len(valid_offers),
+        min_offer=find_min_valid_offer(valid_offers) if valid_offers else None,
+        my_offer=my_offer,
+        my_top=find_my_offer_top(offers) if my_offer else -1,
+    )
+
+
+@metrics.timed("gb_stage_seconds", stage="evaluate_rows")
+def evaluate_rows(
+    offers: list[LeanOffer],
+    run_rows: list[RowRun],
+) -> list[OfferEvaluation | Exception]:
+    results: list[OfferEvaluation | Exception] = []
+
+    if config.EVALUATION_ENGINE != "columnar":
+        for run_row in run_rows:
+            try:
+                results.append(evaluate_offers(offers, run_row))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    ok_rows: list[RowRun] = []
+    blacklists: list[frozenset[str]] = []
+    for run_row in run_rows:
+        try:
+            blacklists.append(run_row.get_blacklist())
+            ok_rows.append(run_row)
+            results.append(None)
+        except Exception as e:
+            results.append(e)
+
+    evaluations = iter(OfferColumns(offers).evaluate_many(ok_rows, blacklists))
+    return [result if result is not None else next(evaluations) for result in results]
+
+
+def apply_evaluation(
+    run_row: RowRun,
+    evaluation: OfferEvaluation,
+) -> None:
+    run_row.Note = ""
+
+    if evaluation.min_offer:
+        min_offer = evaluation.min_offer
+        offer_logger.info("Min offer: %s", min_offer)
+        run_row.SELLER = min_offer.seller_name
+        run_row.LOWEST_PRICE_EUR = str(min_offer.price)
+        run_row.LOWEST_PRICE_USD = str(min_offer.local_price)
+
+    else:
+        offer_logger.info("No valid offer")
+        run_row.SELLER = ""
+        run_row.LOWEST_PRICE_EUR = ""
+        run_row.LOWEST_PRICE_USD = ""
+        run_row.Note = run_row.Note + "Không có seller hợp lệ \n"
+
+    if evaluation.my_offer:
+        my_offer = evaluation.my_offer
+        offer_logger.info("My offer at top %s", evaluation.my_top)
+        run_row.Top = str(evaluation.my_top)
+        run_row.CNLGAMING_EUR = str(my_offer.price)
+        run_row.CNLGAMING_USD = str(my_offer.local_price)
+
+    else:
+        offer_logger.info("Can't find my offer")
+        run_row.Top = "NaN"
+        run_row.CNLGAMING_EUR = ""
+        run_row.CNLGAMING_USD = ""
+        run_row.Note = run_row.Note + f"Không tìm thấy seller {config.OUR_SELLER_NAME}"
+
+    run_row.Time_update = last_update_message(datetime.now())
+
+
+def row_result_key(run_row: RowRun, digest: str) -> tuple:
+    return (
+        digest,
+        run_row.PRODUCT_COMPARE,
+        run_row.FEEDBACK_QTY,
+        run_row.FEEDBACK_PERCENT,
+        run_row.DELIVERY_TIME,
+        run_row.MIN_QTY,
+        run_row.STOCK1,
+        run_row.get_blacklist(),
+        config.OUR_SELLER_NAME,
+    )
+
+
+def log_cache_stats() -> None:
+    page_hits, page_misses = page_cache.reset_stats()
+    row_hits, row_misses = row_result_cache.reset_stats()
+    logger.info(
+        f"Page cache hits: {page_hits}, misses: {page_misses}; "
+        f"reused rows: {row_hits}, evaluated rows: {row_misses}"
+    )
+    logger.info(
+        f"Circuits: gameboost={gameboost_breaker.state}, sheets={sheets_breaker.state}"
+    )
+    logger.info(metrics.round_summary())
+
+
+def report_row_error(
+    index: int,
+    e: Exception,
+    writer: SheetWriter | None = None,
+) -> None:
+    if isinstance(e, ValidationError):
+        logger.error("VALIDATION ERROR AT ROW: %s %s", index, e.errors())
+        update_note_message(
             index=index,
             messages=f"{last_update_message(datetime.now())} VALIDATION ERROR AT ROW: {index}",
+            writer=writer,
         )
-        sleep_for(DEFAULT_RELAX_TIME)
-
-    except Exception as e:
-        logger.exception(f"FAILED AT ROW: {index}")
-        logger.exception(e)
-        RowRun.update_note_message(
-            sheet_id=config.SPREADSHEET_KEY,
-            sheet_name=config.SHEET_NAME,
+
+    else:
+        logger.error("FAILED AT ROW: %s", index, exc_info=e)
+        update_note_message(
             index=index,
             messages=f"{last_update_message(datetime.now())} FAILED AT ROW: {index}",
+            writer=writer,
+        )
+
+
+def fetch_group(
+    sb,
+    tasks: list[RowTask],
+    writer: SheetWriter | None = None,
+) -> FetchedGroup | None:
+    # Browser bound half of ``run_group``, failures are reported on the rows
+    indexes = [index for index, _ in tasks]
+    with log_context(row=indexes, stage="fetch"):
+        try:
+            logger.info("Processing rows: %s", indexes)
+            # Throttled reads skip the group instead of holding the crawl thread
+            with sheets_governor.non_blocking():
+                run_rows: list[RowRun] = [
+                    run_row
+                    or RowRun.get(
+                        sheet_id=config.SPREADSHEET_KEY,
+                        sheet_name=config.SHEET_NAME,
+                        index=index,
+                    )
+                    for index, run_row in tasks
+                ]
+
+            offers, digest = collect_offers(sb, run_rows[0].PRODUCT_COMPARE, run_rows)
+            if price_history is not None:
+                price_history.record(run_rows[0].PRODUCT_COMPARE, digest, offers)
+
+        except CircuitOpenError as e:
+            # Rows keep their last result until the dependency is back
+            logger.info(f"Skip rows {indexes}: {e}")
+            return None
+
+        except Exception as e:
+            for index in indexes:
+                row_result_cache.pop(index)
+                report_row_error(index, e, writer)
+            sleep_for(DEFAULT_RELAX_TIME)
+            return None
+
+    return run_rows, offers, digest
+
+
+def write_group(
+    fetched: FetchedGroup,
+    writer: SheetWriter | None = None,
+) -> None:
+    run_rows, offers, digest = fetched
+
+    # Same payload and same row inputs give the same evaluation: it is reused
+    # and still written, the diff writes only send cells changed on the sheet
+    # since it was read and the heartbeat when due
+    evaluated: list[tuple[RowRun, OfferEvaluation | Exception]] = []
+    changed_rows: list[RowRun] = []
+    row_keys: dict[int, tuple] = {}
+    for run_row in run_rows:
+        try:
+            row_key = row_result_key(run_row, digest)
+        except Exception:
+            changed_rows.append(run_row)
+            continue
+
+        row_keys[run_row.index] = row_key
+        cached = row_result_cache.get_matching(
+            run_row.index, lambda item: item[0] == row_key
+        )
+        if cached is not None:
+            logger.info("Unchanged result, reuse evaluation for row: %s", run_row.index)
+            evaluated.append((run_row, cached[1]))
+        else:
+            changed_rows.append(run_row)
+
+    evaluated.extend(zip(changed_rows, evaluate_rows(offers, changed_rows)))
+    for run_row, evaluation in evaluated:
+        with log_context(
+            row=run_row.index, url=run_row.PRODUCT_COMPARE, stage="evaluate"
+        ):
+            try:
+                if isinstance(evaluation, Exception):
+                    raise evaluation
+
+                apply_evaluation(run_row, evaluation)
+                if writer:
+                    writer.put(run_row)
+                else:
+                    run_row.update()
+
+                if run_row.index in row_keys:
+                    row_result_cache.put(
+                        run_row.index, (row_keys[run_row.index], evaluation)
+                    )
+
+            except Exception as e:
+                row_result_cache.pop(run_row.index)
+                report_row_error(run_row.index, e, writer)
+
+
+def relax_after(run_rows: list[RowRun]) -> None:
+    sleep_for(max(run_row.RELAX for run_row in run_rows), level=logging.DEBUG)
+
+
+def run_group(
+    sb,
+    tasks: list[RowTask],
+    writer: SheetWriter | None = None,
+) -> bool:
+    # False when the group was skipped or failed before anything was written
+    fetched = fetch_group(sb, tasks, writer)
+    if fetched is None:
+        return False
+
+    write_group(fetched, writer)
+    relax_after(fetched[0])
+    return True
+
+
+class GroupPipeline:
+    # Fetch, evaluation and sheet writing as overlapping stages: the crawl
+    # thread fetches and relaxes, evaluation runs on ``workers`` threads and
+    # the writer flushes in its own thread. Both queues are bounded, so a slow
+    # writer holds back evaluation and in turn the next fetch
+    def __init__(
+        self, writer: SheetWriter | None, queue_size: int, workers: int = 1
+    ) -> None:
+        self.writer = writer
+        self.workers = workers
+
+        self._queue: queue.Queue[tuple[FetchedGroup, Lease | None] | None] = (
+            queue.Queue(maxsize=max(queue_size, 1))
         )
-        sleep_for(DEFAULT_RELAX_TIME)
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self) -> "GroupPipeline":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"evaluate-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def run_group(self, sb, tasks: list[RowTask], lease: Lease | None = None) -> bool:
+        # True once the group is queued, the lease is then completed or
+        # released by the evaluation thread after the write-back
+        fetched = fetch_group(sb, tasks, self.writer)
+        if fetched is None:
+            return False
+
+        with metrics.span("gb_stage_seconds", stage="pipeline_backpressure"):
+            self._queue.put((fetched, lease))
+        relax_after(fetched[0])
+        return True
+
+    def drain(self) -> None:
+        # Waits for every fetched group to be evaluated and handed to the writer
+        self._queue.join()
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+
+                fetched, lease = item
+                try:
+                    write_group(fetched, self.writer)
+                except Exception as e:
+                    logger.exception(e)
+                    if lease is not None:
+                        lease.release()
+                else:
+                    if lease is not None:
+                        lease.complete()
+            finally:
+                self._queue.task_done()
+
+
+def run(
+    sb,
+    index: int,
+    run_row: RowRun | None = None,
+    writer: SheetWriter | None = None,
+) -> None:
+    run_group(sb, [(index, run_row)], writer)
+
+
+def run_leased_group(
+    sb,
+    tasks: list[RowTask],
+    writer: SheetWriter | None = None,
+    leases: LeaseQueue | None = None,
+    pipeline: GroupPipeline | None = None,
+) -> bool:
+    # False when the group did not run here: leased elsewhere, skipped or failed
+    if leases is None:
+        if pipeline is not None:
+            return pipeline.run_group(sb, tasks)
+        return run_group(sb, tasks, writer)
+
+    key = group_key(tasks)
+    lease = leases.acquire(key)
+    if lease is None:
+        logger.info(f"Leased or recently done by another worker, skip: {key}")
+        return False
+
+    # Completed only once the rows are written, a skipped or failed group is
+    # released for any worker to retry
+    try:
+        if pipeline is not None:
+            ran = pipeline.run_group(sb, tasks, lease)
+            if not ran:
+                lease.release()
+        else:
+            ran = run_group(sb, tasks, writer)
+            if ran:
+                lease.complete()
+            else:
+                lease.release()
+    except BaseException:
+        lease.release()
+        raise
+
+    return ran
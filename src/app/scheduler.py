@@ -0,0 +1,138 @@
+import heapq
+import itertools
+import time
+from collections import deque
+
+from .processes import RowTask, group_run_rows
+from .sheet.models import RowRun
+from . import logger
+
+
+class RowSchedule:
+    __slots__ = ("run_row", "next_due", "signature", "changes")
+
+    def __init__(self, run_row: RowRun | None, history: int) -> None:
+        self.run_row = run_row
+        self.next_due = 0.0
+        self.signature: tuple | None = None
+        self.changes: deque[bool] = deque(maxlen=history)
+
+
+class AdaptiveScheduler:
+    # Rows whose lowest price / Top moved recently are checked more often,
+    # stable rows drift towards ``max_interval``
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        history: int = 5,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.history = history
+
+        self._rows: dict[int, RowSchedule] = {}
+        self._heap: list[tuple[float, int, int]] = []
+        self._counter = itertools.count()
+
+    def _push(self, index: int, next_due: float) -> None:
+        self._rows[index].next_due = next_due
+        heapq.heappush(self._heap, (next_due, next(self._counter), index))
+
+    def sync(self, run_rows: dict[int, RowRun | None]) -> None:
+        now = time.monotonic()
+        for index in [index for index in self._rows if index not in run_rows]:
+            del self._rows[index]
+
+        for index, run_row in run_rows.items():
+            schedule = self._rows.get(index, None)
+            if (
+                schedule is None
+                or schedule.run_row is None
+                or run_row is None
+                or schedule.run_row.PRODUCT_COMPARE != run_row.PRODUCT_COMPARE
+            ):
+                self._rows[index] = RowSchedule(run_row, self.history)
+                self._push(index, now)
+                continue
+
+            schedule.run_row = run_row
+            due = self._override_due(schedule, now)
+            if due is not None and due < schedule.next_due:
+                self._push(index, due)
+
+    def _override_due(self, schedule: RowSchedule, now: float) -> float | None:
+        run_row = schedule.run_row
+        if run_row is None or run_row.CHECK_INTERVAL is None:
+            return None
+        return now + run_row.CHECK_INTERVAL * 60
+
+    def interval(self, schedule: RowSchedule) -> float:
+        run_row = schedule.run_row
+        if run_row is not None and run_row.CHECK_INTERVAL is not None:
+            return run_row.CHECK_INTERVAL * 60
+
+        if not schedule.changes:
+            return self.min_interval
+
+        change_rate = sum(schedule.changes) / len(schedule.changes)
+        return self.max_interval - (self.max_interval - self.min_interval) * change_rate
+
+    def due_groups(self) -> list[list[RowTask]]:
+        now = time.monotonic()
+        due_rows: dict[int, RowRun | None] = {}
+        while self._heap and self._heap[0][0] <= now:
+            next_due, _, index = heapq.heappop(self._heap)
+            schedule = self._rows.get(index, None)
+            # Entries are pushed again on reschedule, skip the stale ones
+            if schedule is None or schedule.next_due != next_due:
+                continue
+            due_rows[index] = schedule.run_row
+
+        return group_run_rows(due_rows)
+
+    def complete(self, groups: list[list[RowTask]]) -> None:
+        now = time.monotonic()
+        for group in groups:
+            for index, run_row in group:
+                schedule = self._rows.get(index, None)
+                if schedule is None:
+                    continue
+
+                if run_row is not None:
+                    signature = (
+                        run_row.LOWEST_PRICE_EUR,
+                        run_row.SELLER,
+                        run_row.Top,
+                    )
+                    if schedule.signature is not None:
+                        schedule.changes.append(signature != schedule.signature)
+                    schedule.signature = signature
+
+                interval = self.interval(schedule)
+                logger.info(f"Row {index} next check in {interval:.0f} seconds")
+                self._push(index, now + interval)
+
+    def postpone(self, groups: list[list[RowTask]]) -> None:
+        # Groups that did not run (open circuit, leased elsewhere, fetch error)
+        # are tried again after their current interval, nothing is learned
+        now = time.monotonic()
+        for group in groups:
+            for index, _ in group:
+                schedule = self._rows.get(index, None)
+                if schedule is None:
+                    continue
+
+                interval = self.interval(schedule)
+                logger.info(f"Row {index} did not run, retry in {interval:.0f} seconds")
+                self._push(index, now + interval)
+
+    def next_due_in(self) -> float | None:
+        while self._heap:
+            next_due, _, index = self._heap[0]
+            schedule = self._rows.get(index, None)
+            if schedule is not None and schedule.next_due == next_due:
+                return max(next_due - time.monotonic(), 0)
+            heapq.heappop(self._heap)
+
+        return None
@@ -0,0 +1,108 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Literal
+
+from app import logger
+
+from .metrics import metrics
+
+State = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, message: str, retry_in: float = 0) -> None:
+        super().__init__(message)
+        # Seconds until the circuit lets a probe through
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    # Closed: calls go through and failures are counted. Open: calls fail at
+    # once for ``reset_timeout`` seconds. Half open: up to ``half_open_calls``
+    # probes go through, a success closes the circuit and a failure reopens it
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+
+        self._state: State = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> State:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> State:
+        if (
+            self._state == "open"
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._transition("half_open")
+        return self._state
+
+    def _transition(self, state: State) -> None:
+        logger.info(f"Circuit {self.name}: {self._state} -> {state}")
+        metrics.inc("gb_breaker_transitions_total", breaker=self.name, state=state)
+        self._state = state
+        self._probes = 0
+        if state == "open":
+            self._opened_at = time.monotonic()
+        elif state == "closed":
+            self._failures = 0
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return
+            if state == "half_open" and self._probes < self.half_open_calls:
+                self._probes += 1
+                return
+
+            retry_in = max(self._opened_at + self.reset_timeout - time.monotonic(), 0)
+            metrics.inc("gb_breaker_rejected_total", breaker=self.name)
+            raise CircuitOpenError(
+                f"{self.name} circuit is {state}, retry in {retry_in:.0f}s",
+                retry_in=retry_in,
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != "closed":
+                self._transition("closed")
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self._transition("open")
+
+    @contextmanager
+    def call(self, is_failure: Callable[[Exception], bool] = lambda e: True):
+        self.before_call()
+        try:
+            yield
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                # The dependency answered, the error is ours
+                self.record_success()
+            raise
+        else:
+            self.record_success()
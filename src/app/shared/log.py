@@ -0,0 +1,100 @@
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import random
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s :: %(message)s"
+
+# Fields set with ``log_context`` and written as JSON keys
+CONTEXT_FIELDS = ("row", "url", "stage")
+
+_context: contextvars.ContextVar[dict] = contextvars.ContextVar(
+    "log_context", default={}
+)
+
+
+@contextmanager
+def log_context(**fields):
+    # Attaches the fields to every record logged by this thread in the block
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    # Runs in the logging thread, before the record is queued
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SampleFilter(logging.Filter):
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class LazyQueueHandler(QueueHandler):
+    # The stock handler formats the message before queueing it, here the
+    # record is queued as is and formatted by the listener thread
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(
+    level: str,
+    format: str,
+    use_queue: bool,
+    offer_level: str,
+    offer_sample_rate: float,
+) -> None:
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        JsonFormatter() if format == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+
+    root_handler: logging.Handler = handler
+    if use_queue:
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(records, handler)
+        listener.start()
+        # Flushes the records still queued at exit
+        atexit.register(listener.stop)
+        root_handler = LazyQueueHandler(records)
+
+    root_handler.addFilter(ContextFilter())
+    logging.basicConfig(level=level, handlers=[root_handler])
+
+    # Per-offer lines of ``processes``, gated and sampled on their own
+    offer_logger = logging.getLogger("app.offers")
+    offer_logger.setLevel(offer_level)
+    if offer_sample_rate < 1:
+        offer_logger.addFilter(SampleFilter(offer_sample_rate))
@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._items: OrderedDict[Hashable, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> V | None:
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def get_matching(self, key: Hashable, check: Callable[[V], bool]) -> V | None:
+        # Like ``get``, a cached value failing ``check`` counts as a miss
+        with self._lock:
+            value = self._items.get(key, None)
+            if value is None or not check(value):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def reset_stats(self) -> tuple[int, int]:
+        with self._lock:
+            stats = (self.hits, self.misses)
+            self.hits = 0
+            self.misses = 0
+            return stats
@@ -0,0 +1,180 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from app import logger
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+LabelKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+def _label_key(name: str, labels: dict[str, str]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...], **extra: str) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._histograms: dict[LabelKey, Histogram] = {}
+        self._counters: dict[LabelKey, float] = {}
+        # Totals at the last round summary, the summary reports the difference
+        self._round_base: dict[LabelKey, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _label_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key, None)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = _label_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def span(self, name: str, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels: str):
+        def wrapper(func: Callable):
+            @wraps(func)
+            def inner(*args, **kwargs):
+                with self.span(name, **labels):
+                    return func(*args, **kwargs)
+
+            return inner
+
+        return wrapper
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name in sorted({key[0] for key in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (key_name, labels), histogram in sorted(self._histograms.items()):
+                    if key_name != name:
+                        continue
+                    cumulative = 0
+                    for bucket, count in zip(
+                        histogram.buckets, histogram.bucket_counts
+                    ):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket{_format_labels(labels, le=str(bucket))} "
+                            f"{cumulative}"
+                        )
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, le='+Inf')} "
+                        f"{histogram.count}"
+                    )
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {histogram.count}"
+                    )
+
+            for name in sorted({key[0] for key in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (key_name, labels), value in sorted(self._counters.items()):
+                    if key_name == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def round_summary(self) -> str:
+        parts: list[str] = []
+        with self._lock:
+            for key, histogram in sorted(self._histograms.items()):
+                base_count, base_sum = self._round_base.get(key, (0, 0.0))
+                count = histogram.count - base_count
+                if count:
+                    total = histogram.sum - base_sum
+                    label = ",".join(v for _, v in key[1]) or key[0]
+                    parts.append(f"{label}={count}x{total / count * 1000:.1f}ms")
+                self._round_base[key] = (histogram.count, histogram.sum)
+
+            for key, value in sorted(self._counters.items()):
+                base_value, _ = self._round_base.get(key, (0, 0.0))
+                if value - base_value:
+                    label = ",".join(v for _, v in key[1])
+                    parts.append(f"{key[0]}[{label}]={value - base_value:g}")
+                self._round_base[key] = (value, 0.0)
+
+        return "Round metrics: " + (" ".join(parts) or "no activity")
+
+
+metrics = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    )
+    thread.start()
+    logger.info(f"Metrics endpoint: http://{host}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,148 @@
+import threading
+import time
+
+from gspread.exceptions import APIError
+
+from .. import config
+from ..shared.breaker import CircuitOpenError
+from .exceptions import SheetError
+from .g_sheet import gsheet_cache
+from .governor import SheetsGovernor
+from . import logger
+
+
+class BlacklistCache:
+    def __init__(self, ttl: float, case_insensitive: bool = False) -> None:
+        self.ttl = ttl
+        self.case_insensitive = case_insensitive
+
+        self._blacklists: dict[tuple[str, str, str], tuple[frozenset[str], float]] = {}
+        # Keys refreshed by a background thread, guarded by ``_lock``
+        self._refreshing: set[tuple[str, str, str]] = set()
+        self._lock = threading.Lock()
+
+    def normalize(self, name: str) -> str:
+        name = name.strip()
+        if self.case_insensitive:
+            return name.casefold()
+        return name
+
+    def _is_fresh(self, key: tuple[str, str, str]) -> bool:
+        cached = self._blacklists.get(key)
+        return cached is not None and time.monotonic() - cached[1] < self.ttl
+
+    def prefetch(self, sheet_id: str, sheet_name: str, ranges: list[str]) -> None:
+        with self._lock:
+            stale_ranges = [
+                blacklist_range
+                for blacklist_range in dict.fromkeys(ranges)
+                if not self._is_fresh((sheet_id, sheet_name, blacklist_range))
+            ]
+
+        if not stale_ranges:
+            return
+
+        logger.info(f"Fetch blacklist ranges: {stale_ranges}")
+        try:
+            worksheet = gsheet_cache.get_worksheet(
+                sheet_id=sheet_id, sheet_name=sheet_name
+            )
+            with gsheet_cache.guard(
+                sheet_id=sheet_id, sheet_name=sheet_name, method="batch_get"
+            ):
+                results = worksheet.batch_get(stale_ranges)
+        except Exception as e:
+            if not (
+                isinstance(e, (CircuitOpenError, APIError))
+                or SheetsGovernor.is_retryable(e)
+            ):
+                raise
+
+            # During a Sheets outage a stale blacklist beats failing the rows,
+            # only ranges never fetched have nothing to fall back on
+            with self._lock:
+                missing = [
+                    blacklist_range
+                    for blacklist_range in stale_ranges
+                    if (sheet_id, sheet_name, blacklist_range) not in self._blacklists
+                ]
+            if missing:
+                raise
+            logger.info(f"Keep stale blacklist ranges {stale_ranges}: {e}")
+            return
+
+        fetched_at = time.monotonic()
+        with self._lock:
+            for blacklist_range, blacklist in zip(stale_ranges, results):
+                names = frozenset(
+                    self.normalize(str(name)) for row in blacklist for name in row
+                )
+                self._blacklists[(sheet_id, sheet_name, blacklist_range)] = (
+                    names,
+                    fetched_at,
+                )
+
+    def put(
+        self, sheet_id: str, sheet_name: str, blacklist_range: str, names: list[str]
+    ) -> None:
+        with self._lock:
+            self._blacklists[(sheet_id, sheet_name, blacklist_range)] = (
+                frozenset(self.normalize(name) for name in names),
+                time.monotonic(),
+            )
+
+    def get(
+        self, sheet_id: str, sheet_name: str, blacklist_range: str
+    ) -> frozenset[str]:
+        key = (sheet_id, sheet_name, blacklist_range)
+        with self._lock:
+            fresh = self._is_fresh(key)
+            cached = key in self._blacklists
+
+        # A stale blacklist is served while it is refreshed off the caller's
+        # thread, only a range never fetched waits for Sheets
+        if not fresh:
+            if cached:
+                self._refresh_later(key)
+            else:
+                self.prefetch(
+                    sheet_id=sheet_id, sheet_name=sheet_name, ranges=[blacklist_range]
+                )
+
+        blacklist = self._blacklists[key][0]
+        if blacklist:
+            return blacklist
+
+        raise SheetError(f"{sheet_id}->{sheet_name}->{blacklist_range} is None")
+
+    def _refresh_later(self, key: tuple[str, str, str]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        threading.Thread(
+            target=self._refresh, args=(key,), name="blacklist-refresh", daemon=True
+        ).start()
+
+    def _refresh(self, key: tuple[str, str, str]) -> None:
+        sheet_id, sheet_name, blacklist_range = key
+        try:
+            self.prefetch(
+                sheet_id=sheet_id, sheet_name=sheet_name, ranges=[blacklist_range]
+            )
+        except Exception as e:
+            logger.info(f"Keep stale blacklist range {blacklist_range}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._blacklists.clear()
+
+
+blacklist_cache = BlacklistCache(
+    ttl=config.BLACKLIST_TTL,
+    case_insensitive=config.BLACKLIST_CASE_INSENSITIVE,
+)
@@ -0,0 +1,48 @@
+import threading
+import time
+from typing import Any
+
+
+class CellCache:
+    # Last known value of every written cell, seeded from the round's read
+    def __init__(self) -> None:
+        self._values: dict[tuple[str, str, str], str] = {}
+        self._heartbeats: dict[tuple[str, str, int], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(value: Any) -> str:
+        if value is None:
+            return ""
+        return str(value).strip()
+
+    def record(self, sheet_id: str, sheet_name: str, cells: dict[str, Any]) -> None:
+        with self._lock:
+            for cell, value in cells.items():
+                self._values[(sheet_id, sheet_name, cell)] = self.normalize(value)
+
+    def is_changed(self, sheet_id: str, sheet_name: str, cell: str, value: Any) -> bool:
+        with self._lock:
+            known = self._values.get((sheet_id, sheet_name, cell), None)
+        return known is None or known != self.normalize(value)
+
+    def heartbeat_due(
+        self, sheet_id: str, sheet_name: str, index: int, interval: float
+    ) -> bool:
+        with self._lock:
+            last = self._heartbeats.get((sheet_id, sheet_name, index), None)
+        return last is None or time.monotonic() - last >= interval
+
+    def record_heartbeat(self, sheet_id: str, sheet_name: str, index: int) -> None:
+        with self._lock:
+            self._heartbeats[(sheet_id, sheet_name, index)] = time.monotonic()
+
+    def invalidate(self, sheet_id: str, sheet_name: str) -> None:
+        with self._lock:
+            for key in [k for k in self._values if k[:2] == (sheet_id, sheet_name)]:
+                self._values.pop(key, None)
+            for key in [k for k in self._heartbeats if k[:2] == (sheet_id, sheet_name)]:
+                self._heartbeats.pop(key, None)
+
+
+cell_cache = CellCache()
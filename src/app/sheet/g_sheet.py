@@ -1,6 +1,138 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from gspread import Client, Spreadsheet, service_account
+from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
+from gspread.worksheet import Worksheet
+
 from ..paths import ROOT_PATH
+from ..shared.breaker import CircuitBreaker
+from ..shared.metrics import metrics
 from .. import config
+from .governor import SheetsGovernor, sheets_governor
+from . import logger
+
+INVALIDATE_STATUS_CODES = (403, 404)
+
+
+class GSheetCache:
+    def __init__(
+        self,
+        keys_path: str,
+        ttl: float,
+        governor: SheetsGovernor | None = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        self.keys_path = keys_path
+        self.ttl = ttl
+        self.governor = governor
+        self.breaker = breaker
+
+        self._client: Client | None = None
+        self._spreadsheets: dict[str, tuple[Spreadsheet, float]] = {}
+        self._worksheets: dict[tuple[str, str], tuple[Worksheet, float]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def client(self) -> Client:
+        with self._lock:
+            if self._client is None:
+                self._client = service_account(ROOT_PATH.joinpath(self.keys_path))
+            return self._client
+
+    def set_client(self, client: Client) -> None:
+        with self._lock:
+            self._client = client
+            self._spreadsheets.clear()
+            self._worksheets.clear()
+
+    def _is_fresh(self, cached_at: float) -> bool:
+        return time.monotonic() - cached_at < self.ttl
+
+    def get_spreadsheet(self, sheet_id: str) -> Spreadsheet:
+        with self._lock:
+            cached = self._spreadsheets.get(sheet_id)
+            if cached and self._is_fresh(cached[1]):
+                return cached[0]
+
+            with self.guard(sheet_id, "", method="open_by_key"):
+                spreadsheet = self.client.open_by_key(sheet_id)
+            self._spreadsheets[sheet_id] = (spreadsheet, time.monotonic())
+            return spreadsheet
+
+    def get_worksheet(self, sheet_id: str, sheet_name: str) -> Worksheet:
+        with self._lock:
+            cached = self._worksheets.get((sheet_id, sheet_name))
+            if cached and self._is_fresh(cached[1]):
+                return cached[0]
+
+            spreadsheet = self.get_spreadsheet(sheet_id)
+            with self.guard(sheet_id, sheet_name, method="worksheet"):
+                worksheet = spreadsheet.worksheet(sheet_name)
+            self._worksheets[(sheet_id, sheet_name)] = (worksheet, time.monotonic())
+            return worksheet
+
+    def invalidate(self, sheet_id: str, sheet_name: str | None = None) -> None:
+        with self._lock:
+            if sheet_name is None:
+                self._spreadsheets.pop(sheet_id, None)
+                for key in [key for key in self._worksheets if key[0] == sheet_id]:
+                    self._worksheets.pop(key, None)
+            else:
+                self._worksheets.pop((sheet_id, sheet_name), None)
+
+    @contextmanager
+    def guard(self, sheet_id: str, sheet_name: str, method: str = "call"):
+        # Wraps every Sheets API call: circuit, quota, metrics and handle
+        # invalidation. An open circuit fails before taking a quota token, a
+        # non-blocking caller without a token fails before the circuit
+        if self.governor is not None:
+            self.governor.check(method)
+        with (
+            self.breaker.call(is_failure=SheetsGovernor.is_retryable)
+            if self.breaker is not None
+            else nullcontext()
+        ):
+            with self._guard(sheet_id, sheet_name, method):
+                yield
+
+    @contextmanager
+    def _guard(self, sheet_id: str, sheet_name: str, method: str):
+        if self.governor is not None:
+            self.governor.acquire(method)
+        metrics.inc("gb_sheets_calls_total", method=method)
+        start = time.perf_counter()
+        try:
+            yield
+        except (SpreadsheetNotFound, WorksheetNotFound):
+            metrics.inc("gb_sheets_errors_total", method=method)
+            logger.info(f"Invalidate cached handle: {sheet_id}->{sheet_name}")
+            self.invalidate(sheet_id)
+            raise
+        except APIError as e:
+            metrics.inc("gb_sheets_errors_total", method=method)
+            if self.governor is not None:
+                self.governor.on_error(method, e)
+            if e.response.status_code in INVALIDATE_STATUS_CODES:
+                logger.info(f"Invalidate cached handle: {sheet_id}->{sheet_name}")
+                self.invalidate(sheet_id)
+            raise
+        finally:
+            metrics.observe(
+                "gb_sheets_call_seconds", time.perf_counter() - start, method=method
+            )
+
 
-from gspread import service_account
+sheets_breaker = CircuitBreaker(
+    name="sheets",
+    failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=config.BREAKER_RESET_TIMEOUT,
+)
 
-gsheet_client = service_account(ROOT_PATH.joinpath(config.KEYS_PATH))
+gsheet_cache = GSheetCache(
+    keys_path=config.KEYS_PATH,
+    ttl=config.SHEET_HANDLE_TTL,
+    governor=sheets_governor,
+    breaker=sheets_breaker,
+)
@@ -0,0 +1,196 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable
+
+from gspread.exceptions import APIError
+from requests.exceptions import ConnectionError, Timeout
+
+from ..shared.breaker import CircuitOpenError
+from ..shared.metrics import metrics
+from .. import config
+from . import logger
+
+WRITE_METHODS = frozenset({"batch_update", "update"})
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Set by ``SheetsGovernor.non_blocking``, new threads start blocking
+_non_blocking: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "sheets_non_blocking", default=False
+)
+
+
+class SheetsThrottledError(CircuitOpenError):
+    # Handled like an open circuit: skip now, the data is read again later
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, capacity: float) -> None:
+        self.rate = rate_per_minute / 60
+        self.capacity = max(capacity, 1)
+
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        # Takes one token, possibly in advance, and returns how long to wait for it
+        # Reserving keeps callers in FIFO order without holding the lock asleep
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(-self._tokens / self.rate, self._paused_until - now, 0)
+            return wait
+
+    def available_in(self) -> float:
+        # Seconds until a token is free, without taking it
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return max((1 - self._tokens) / self.rate, self._paused_until - now, 0)
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        # Quota exceeded: hold every caller back and drain the burst
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 0)
+
+
+class SheetsGovernor:
+    def __init__(
+        self,
+        reads_per_minute: float,
+        writes_per_minute: float,
+        burst: float,
+        base_delay: float,
+        max_delay: float,
+    ) -> None:
+        self.buckets = {
+            "read": TokenBucket(reads_per_minute, burst),
+            "write": TokenBucket(writes_per_minute, burst),
+        }
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def kind(method: str) -> str:
+        return "write" if method in WRITE_METHODS else "read"
+
+    @contextmanager
+    def non_blocking(self):
+        # Calls in the block fail with ``SheetsThrottledError`` instead of waiting
+        # for a quota token, and retryable errors are raised without a backoff
+        token = _non_blocking.set(True)
+        try:
+            yield
+        finally:
+            _non_blocking.reset(token)
+
+    @staticmethod
+    def is_non_blocking() -> bool:
+        return _non_blocking.get()
+
+    def check(self, method: str) -> None:
+        if not self.is_non_blocking():
+            return
+
+        kind = self.kind(method)
+        wait = self.buckets[kind].available_in()
+        if wait > 0:
+            metrics.inc("gb_sheets_throttled_total", kind=kind)
+            raise SheetsThrottledError(
+                f"Sheets {kind} quota, next token in {wait:.1f}s", retry_in=wait
+            )
+
+    def acquire(self, method: str) -> None:
+        kind = self.kind(method)
+        waited = self.buckets[kind].acquire()
+        if waited > 0:
+            metrics.observe("gb_sheets_throttle_seconds", waited, kind=kind)
+
+    @staticmethod
+    def retry_after(error: APIError) -> float | None:
+        value = error.response.headers.get("Retry-After")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def on_error(self, method: str, error: APIError) -> None:
+        if error.response.status_code != 429:
+            return
+
+        kind = self.kind(method)
+        pause = self.retry_after(error) or self.base_delay
+        logger.info(f"Sheets {kind} quota exceeded on {method}, pause {pause:.1f}s")
+        metrics.inc("gb_sheets_quota_errors_total", kind=kind)
+        self.buckets[kind].pause(pause)
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        # Equal jitter: keep half of the delay, randomize the rest
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if isinstance(error, APIError):
+            delay = max(delay, self.retry_after(error) or 0)
+        return delay
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, APIError):
+            return error.response.status_code in RETRY_STATUS_CODES
+        return isinstance(error, (ConnectionError, Timeout))
+
+    def retry(self, max_retries: int = 5):
+        # Retries quota and transient errors only, anything else is raised at once
+        def wrapper(func: Callable):
+            @wraps(func)
+            def inner(*args, **kwargs):
+                for attempt in range(max_retries + 1):
+                    try:
+                        return func(*args, **kwargs)
+                    except Exception as e:
+                        if (
+                            attempt == max_retries
+                            or not self.is_retryable(e)
+                            or self.is_non_blocking()
+                        ):
+                            raise
+                        delay = self.backoff_delay(attempt, e)
+                        logger.info(
+                            f"Retry: {func.__name__}, {attempt + 1} times in "
+                            f"{delay:.1f}s, failed reason: {e}"
+                        )
+                        metrics.inc("gb_retries_total", function=func.__name__)
+                        time.sleep(delay)
+
+            return inner
+
+        return wrapper
+
+
+sheets_governor = SheetsGovernor(
+    reads_per_minute=config.SHEETS_READS_PER_MINUTE,
+    writes_per_minute=config.SHEETS_WRITES_PER_MINUTE,
+    burst=config.SHEETS_BURST,
+    base_delay=config.SHEETS_BACKOFF_BASE,
+    max_delay=config.SHEETS_BACKOFF_MAX,
+)
@@ -1,20 +1,22 @@
 from typing import Annotated, Final, Self
 
-from gspread import service_account
+from gspread.utils import a1_to_rowcol
 from gspread.worksheet import Worksheet
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
 
 from app import config
-from app.paths import ROOT_PATH
 
-from ..shared.decorators import retry_on_fail
 from .enums import CheckType
-from .exceptions import SheetError
-from .g_sheet import gsheet_client
+from .blacklist import blacklist_cache
+from .governor import sheets_governor
+from .cell_cache import cell_cache
+from .g_sheet import gsheet_cache
+from . import logger
 
 COL_META: Final[str] = "col_name_xxx"
 IS_UPDATE_META: Final[str] = "is_update_xxx"
 IS_NOTE_META: Final[str] = "is_note_xxx"
+IS_HEARTBEAT_META: Final[str] = "is_heartbeat_xxx"
 
 
 class ColSheetModel(BaseModel):
@@ -31,10 +33,7 @@ class ColSheetModel(BaseModel):
         sheet_id: str,
         sheet_name: str,
     ) -> Worksheet:
-        spreadsheet = gsheet_client.open_by_key(sheet_id)
-        worksheet = spreadsheet.worksheet(sheet_name)
-
-        return worksheet
+        return gsheet_cache.get_worksheet(sheet_id=sheet_id, sheet_name=sheet_name)
 
     @classmethod
     def mapping_fields(cls) -> dict:
@@ -60,6 +59,92 @@ class ColSheetModel(BaseModel):
 
         return mapping_fields
 
+    @classmethod
+    def note_mapping_field(cls) -> str | None:
+        for _, field_info in cls.model_fields.items():
+            if hasattr(field_info, "metadata"):
+                for metadata in field_info.metadata:
+                    if COL_META in metadata and IS_NOTE_META in metadata:
+                        return metadata[COL_META]
+
+        return None
+
+    @classmethod
+    def heartbeat_mapping_fields(cls) -> dict:
+        mapping_fields = {}
+        for field_name, field_info in cls.model_fields.items():
+            if hasattr(field_info, "metadata"):
+                for metadata in field_info.metadata:
+                    if COL_META in metadata and IS_HEARTBEAT_META in metadata:
+                        mapping_fields[field_name] = metadata[COL_META]
+                        break
+
+        return mapping_fields
+
+    @classmethod
+    def seed_written_cells(
+        cls,
+        sheet_id: str,
+        sheet_name: str,
+        index: int,
+        model_dict: dict,
+    ) -> None:
+        cell_cache.record(
+            sheet_id=sheet_id,
+            sheet_name=sheet_name,
+            cells={
+                f"{v}{index}": model_dict.get(k, None)
+                for k, v in cls.update_mapping_fields().items()
+            },
+        )
+
+    def update_cells(self) -> dict[str, str | None]:
+        model_dict = self.model_dump(mode="json")
+        cells = {
+            f"{v}{self.index}": model_dict[k]
+            for k, v in self.update_mapping_fields().items()
+        }
+        if not config.SHEET_DIFF_WRITES:
+            return cells
+
+        heartbeat_cells = {
+            f"{v}{self.index}" for v in self.heartbeat_mapping_fields().values()
+        }
+        changed_cells = {
+            cell: value
+            for cell, value in cells.items()
+            if cell not in heartbeat_cells
+            and cell_cache.is_changed(
+                sheet_id=self.sheet_id,
+                sheet_name=self.sheet_name,
+                cell=cell,
+                value=value,
+            )
+        }
+
+        # Heartbeat cells (e.g. Time_update) go along with any other change,
+        # otherwise only once their interval has passed
+        if changed_cells or cell_cache.heartbeat_due(
+            sheet_id=self.sheet_id,
+            sheet_name=self.sheet_name,
+            index=self.index,
+            interval=config.HEARTBEAT_INTERVAL_MINUTES * 60,
+        ):
+            for cell in heartbeat_cells:
+                changed_cells[cell] = cells[cell]
+
+        return changed_cells
+
+    def record_written_cells(self, cells: dict[str, str | None]) -> None:
+        cell_cache.record(
+            sheet_id=self.sheet_id, sheet_name=self.sheet_name, cells=cells
+        )
+        heartbeat_cols = self.heartbeat_mapping_fields().values()
+        if any(f"{v}{self.index}" in cells for v in heartbeat_cols):
+            cell_cache.record_heartbeat(
+                sheet_id=self.sheet_id, sheet_name=self.sheet_name, index=self.index
+            )
+
     @classmethod
     def get(
         cls,
@@ -82,13 +167,17 @@ class ColSheetModel(BaseModel):
             "sheet_name": sheet_name,
         }
 
-        query_results = worksheet.batch_get(query_value)
+        with gsheet_cache.guard(
+            sheet_id=sheet_id, sheet_name=sheet_name, method="batch_get"
+        ):
+            query_results = worksheet.batch_get(query_value)
         count = 0
         for k, _ in mapping_dict.items():
             model_dict[k] = query_results[count].first()
             if isinstance(model_dict[k], str):
                 model_dict[k] = model_dict[k].strip()
             count += 1
+        cls.seed_written_cells(sheet_id, sheet_name, index, model_dict)
         return cls.model_validate(model_dict)
 
     @classmethod
@@ -111,7 +200,10 @@ class ColSheetModel(BaseModel):
             for _, v in mapping_dict.items():
                 query_value.append(f"{v}{index}")
 
-        query_results = worksheet.batch_get(query_value)
+        with gsheet_cache.guard(
+            sheet_id=sheet_id, sheet_name=sheet_name, method="batch_get"
+        ):
+            query_results = worksheet.batch_get(query_value)
 
         count = 0
 
@@ -128,62 +220,130 @@ class ColSheetModel(BaseModel):
                     model_dict[k] = model_dict[k].strip()
                 count += 1
 
+            cls.seed_written_cells(sheet_id, sheet_name, index, model_dict)
             result_list.append(cls.model_validate(model_dict))
         return result_list
 
     @classmethod
-    @retry_on_fail(max_retries=3, sleep_interval=30)
+    def snapshot_range(cls) -> str:
+        columns = sorted(
+            cls.mapping_fields().values(), key=lambda col: a1_to_rowcol(f"{col}1")[1]
+        )
+        return f"{columns[0]}:{columns[-1]}"
+
+    @classmethod
+    def from_snapshot_row(
+        cls,
+        sheet_id: str,
+        sheet_name: str,
+        index: int,
+        row: list[str],
+        first_col: int = 1,
+    ) -> Self:
+        model_dict = {
+            "index": index,
+            "sheet_id": sheet_id,
+            "sheet_name": sheet_name,
+        }
+
+        for k, v in cls.mapping_fields().items():
+            col_index = a1_to_rowcol(f"{v}1")[1] - first_col
+            value = row[col_index] if col_index < len(row) else None
+            if isinstance(value, str):
+                value = value.strip()
+            # Keep the same semantic as ``get``: an empty cell is None
+            model_dict[k] = value if value != "" else None
+
+        cls.seed_written_cells(sheet_id, sheet_name, index, model_dict)
+        return cls.model_validate(model_dict)
+
+    @classmethod
+    def get_snapshot(
+        cls,
+        sheet_id: str,
+        sheet_name: str,
+    ) -> list[list[str]]:
+        worksheet = cls.get_worksheet(sheet_id=sheet_id, sheet_name=sheet_name)
+        with gsheet_cache.guard(sheet_id=sheet_id, sheet_name=sheet_name, method="get"):
+            return worksheet.get(cls.snapshot_range())
+
+    @classmethod
+    @sheets_governor.retry(max_retries=5)
     def batch_update(
         cls,
         sheet_id: str,
         sheet_name: str,
         list_object: list[Self],
+        notes: dict[int, str] | None = None,
     ) -> None:
         worksheet = cls.get_worksheet(
             sheet_id=sheet_id,
             sheet_name=sheet_name,
         )
-        mapping_dict = cls.update_mapping_fields()
+        note_col = cls.note_mapping_field()
         update_batch = []
 
-        for object in list_object:
-            model_dict = object.model_dump(mode="json")
+        object_cells = [(object, object.update_cells()) for object in list_object]
+        for _, cells in object_cells:
+            for cell, value in cells.items():
+                update_batch.append(
+                    {
+                        "range": cell,
+                        "values": [[value]],
+                    }
+                )
 
-            for k, v in mapping_dict.items():
+        note_cells = {}
+        if notes and note_col:
+            for index, messages in notes.items():
+                note_cells[f"{note_col}{index}"] = messages
                 update_batch.append(
                     {
-                        "range": f"{v}{object.index}",
-                        "values": [[model_dict[k]]],
+                        "range": f"{note_col}{index}",
+                        "values": [[messages]],
                     }
                 )
 
-        if len(list_object) > 0:
-            worksheet.batch_update(update_batch)
+        if len(update_batch) > 0:
+            with gsheet_cache.guard(
+                sheet_id=sheet_id, sheet_name=sheet_name, method="batch_update"
+            ):
+                worksheet.batch_update(update_batch)
+
+        for object, cells in object_cells:
+            object.record_written_cells(cells)
+        cell_cache.record(sheet_id=sheet_id, sheet_name=sheet_name, cells=note_cells)
 
-    @retry_on_fail(max_retries=3, sleep_interval=30)
+    @sheets_governor.retry(max_retries=5)
     def update(
         self,
     ) -> None:
-        mapping_dict = self.update_mapping_fields()
-        model_dict = self.model_dump(mode="json")
+        cells = self.update_cells()
+        if not cells:
+            return
 
         worksheet = self.get_worksheet(
             sheet_id=self.sheet_id, sheet_name=self.sheet_name
         )
 
         update_batch = []
-        for k, v in mapping_dict.items():
+        for cell, value in cells.items():
             update_batch.append(
                 {
-                    "range": f"{v}{self.index}",
-                    "values": [[model_dict[k]]],
+                    "range": cell,
+                    "values": [[value]],
                 }
             )
 
-        worksheet.batch_update(update_batch)
+        with gsheet_cache.guard(
+            sheet_id=self.sheet_id, sheet_name=self.sheet_name, method="batch_update"
+        ):
+            worksheet.batch_update(update_batch)
+
+        self.record_written_cells(cells)
 
     @classmethod
-    @retry_on_fail(max_retries=5, sleep_interval=30)
+    @sheets_governor.retry(max_retries=5)
     def update_note_message(
         cls,
         sheet_id: str,
@@ -200,13 +360,24 @@ class ColSheetModel(BaseModel):
                             sheet_name=sheet_name,
                         )
 
-                        worksheet.batch_update(
-                            [
-                                {
-                                    "range": f"{metadata[COL_META]}{index}",
-                                    "values": [[messages]],
-                                }
-                            ]
+                        with gsheet_cache.guard(
+                            sheet_id=sheet_id,
+                            sheet_name=sheet_name,
+                            method="batch_update",
+                        ):
+                            worksheet.batch_update(
+                                [
+                                    {
+                                        "range": f"{metadata[COL_META]}{index}",
+                                        "values": [[messages]],
+                                    }
+                                ]
+                            )
+
+                        cell_cache.record(
+                            sheet_id=sheet_id,
+                            sheet_name=sheet_name,
+                            cells={f"{metadata[COL_META]}{index}": messages},
                         )
 
 
@@ -255,6 +426,7 @@ class RowRun(ColSheetModel):
         {
             COL_META: "G",
             IS_UPDATE_META: True,
+            IS_HEARTBEAT_META: True,
         },
     ] = None
     Note: Annotated[
@@ -328,37 +500,71 @@ class RowRun(ColSheetModel):
             COL_META: "R",
         },
     ]
+    CHECK_INTERVAL: Annotated[
+        float | None,
+        {
+            COL_META: "S",
+        },
+    ] = None
 
-    @staticmethod
-    @retry_on_fail(max_retries=5, sleep_interval=10)
-    def get_run_indexes(sheet_id: str, sheet_name: str, col_index: int) -> list[int]:
-        sheet = RowRun.get_worksheet(sheet_id=sheet_id, sheet_name=sheet_name)
-        run_indexes = []
-        check_col = sheet.col_values(col_index)
-        for idx, value in enumerate(check_col):
-            idx += 1
-            if not isinstance(value, str):
-                value = str(value)
-            if value in [type.value for type in CheckType]:
-                run_indexes.append(idx)
-
-        return run_indexes
-
-    def get_blacklist(self) -> list[str]:
-        g_client = service_account(ROOT_PATH.joinpath(config.KEYS_PATH))
-
-        spreadsheet = g_client.open_by_key(self.sheet_id)
-
-        worksheet = spreadsheet.worksheet(self.sheet_name)
+    @field_validator("CHECK_INTERVAL", mode="before")
+    @classmethod
+    def parse_check_interval(cls, value):
+        # Optional and only read by the adaptive scheduler, text there must not
+        # fail the row
+        try:
+            interval = float(value)
+        except (TypeError, ValueError):
+            return None
+        return interval if interval > 0 else None
 
-        blacklist = worksheet.batch_get([self.BLACKLIST_RANGE])[0]
-        if blacklist:
-            res = []
-            for blist in blacklist:
-                for i in blist:
-                    res.append(i)
-            return res
+    @staticmethod
+    def is_run_value(value) -> bool:
+        if not isinstance(value, str):
+            value = str(value)
+        return value in [type.value for type in CheckType]
 
-        raise SheetError(
-            f"{self.sheet_id}->{self.sheet_name}->{self.BLACKLIST_RANGE} is None"
+    @staticmethod
+    @sheets_governor.retry(max_retries=5)
+    def get_run_rows(sheet_id: str, sheet_name: str) -> dict[int, "RowRun | None"]:
+        # Rows failing validation are mapped to None, the caller falls back to
+        # ``RowRun.get`` so the error is reported on that row as before
+        grid = RowRun.get_snapshot(sheet_id=sheet_id, sheet_name=sheet_name)
+        first_col = a1_to_rowcol(f"{RowRun.snapshot_range().split(':')[0]}1")[1]
+
+        run_rows: dict[int, RowRun | None] = {}
+        for idx, row in enumerate(grid):
+            idx += 1
+            if not row or not RowRun.is_run_value(row[0]):
+                continue
+            try:
+                run_rows[idx] = RowRun.from_snapshot_row(
+                    sheet_id=sheet_id,
+                    sheet_name=sheet_name,
+                    index=idx,
+                    row=row,
+                    first_col=first_col,
+                )
+            except ValidationError:
+                logger.exception(f"Invalid row in snapshot: {idx}")
+                run_rows[idx] = None
+
+        try:
+            blacklist_cache.prefetch(
+                sheet_id=sheet_id,
+                sheet_name=sheet_name,
+                ranges=[row.BLACKLIST_RANGE for row in run_rows.values() if row],
+            )
+        except Exception as e:
+            # One bad range fails the whole batch, each row then fetches its
+            # own and a bad one is reported on that row alone
+            logger.info(f"Blacklist prefetch failed, fetch them by row: {e}")
+
+        return run_rows
+
+    def get_blacklist(self) -> frozenset[str]:
+        return blacklist_cache.get(
+            sheet_id=self.sheet_id,
+            sheet_name=self.sheet_name,
+            blacklist_range=self.BLACKLIST_RANGE,
         )
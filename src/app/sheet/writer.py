@@ -0,0 +1,165 @@
+import threading
+import time
+from typing import Self
+
+from ..shared.breaker import CircuitOpenError
+from ..shared.log import log_context
+from .models import ColSheetModel
+from . import logger
+
+
+class SheetWriter:
+    def __init__(
+        self,
+        model: type[ColSheetModel],
+        sheet_id: str,
+        sheet_name: str,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int = 0,
+    ) -> None:
+        self.model = model
+        self.sheet_id = sheet_id
+        self.sheet_name = sheet_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Producers block once this many results wait for a flush, 0 is unbounded
+        self.max_pending = max_pending
+
+        self._rows: dict[int, ColSheetModel] = {}
+        self._notes: dict[int, str] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        # While flushes fail results are kept without bound, one per row
+        self._failing = False
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="sheet-writer", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def put(self, obj: ColSheetModel) -> None:
+        with self._condition:
+            self._wait_for_room(obj.index)
+            # The row carries its own note, so a pending note message is stale
+            self._notes.pop(obj.index, None)
+            self._rows[obj.index] = obj
+            if self._pending() >= self.batch_size:
+                self._condition.notify_all()
+
+    def put_note(self, index: int, messages: str) -> None:
+        with self._condition:
+            self._wait_for_room(index)
+            self._notes[index] = messages
+            if self._pending() >= self.batch_size:
+                self._condition.notify_all()
+
+    def _pending(self) -> int:
+        return len(self._rows) + len(self._notes)
+
+    def _wait_for_room(self, index: int) -> None:
+        # Replacing a pending result does not grow the queue
+        if (
+            not self.max_pending
+            or self._failing
+            or index in self._rows
+            or index in self._notes
+        ):
+            return
+        while not self._closed and self._pending() >= self.max_pending:
+            self._condition.notify_all()
+            self._condition.wait()
+
+    def _wait_for_flush(self, last_flush: float, retry_at: float) -> None:
+        # A failed flush is retried at ``retry_at`` whatever is pending, a full
+        # batch would otherwise retry in a busy loop
+        while not self._closed:
+            now = time.monotonic()
+            if now < retry_at:
+                timeout = retry_at - now
+            elif (
+                self._pending() < self.batch_size
+                and now - last_flush < self.flush_interval
+            ):
+                timeout = self.flush_interval - (now - last_flush)
+            else:
+                return
+            self._condition.wait(timeout)
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        retry_at = 0.0
+        while True:
+            with self._condition:
+                self._wait_for_flush(last_flush, retry_at)
+
+                closed = self._closed
+                rows, self._rows = self._rows, {}
+                notes, self._notes = self._notes, {}
+
+            retry_delay = self._flush(rows, notes)
+            last_flush = time.monotonic()
+            retry_at = last_flush + retry_delay
+            with self._condition:
+                # Wake producers waiting for room
+                self._condition.notify_all()
+
+            if closed:
+                with self._condition:
+                    rows, self._rows = self._rows, {}
+                    notes, self._notes = self._notes, {}
+                if rows or notes:
+                    self._flush(rows, notes)
+                return
+
+    def _flush(self, rows: dict[int, ColSheetModel], notes: dict[int, str]) -> float:
+        # Seconds to wait before the next flush, 0 unless this one failed
+        if not rows and not notes:
+            return 0
+
+        with log_context(stage="write"):
+            logger.info(f"Flush {len(rows)} rows and {len(notes)} notes")
+            try:
+                self.model.batch_update(
+                    sheet_id=self.sheet_id,
+                    sheet_name=self.sheet_name,
+                    list_object=list(rows.values()),
+                    notes=notes,
+                )
+                self._failing = False
+                return 0
+            except Exception as e:
+                retry_delay = self.flush_interval
+                if isinstance(e, CircuitOpenError):
+                    retry_delay = max(retry_delay, e.retry_in)
+                    logger.info(f"Flush skipped, keep results for next flush: {e}")
+                else:
+                    logger.exception(f"Flush failed, keep results for next flush: {e}")
+                with self._condition:
+                    self._failing = True
+                    # Results produced while flushing are newer, keep them
+                    for index, row in rows.items():
+                        if index not in self._rows and index not in self._notes:
+                            self._rows[index] = row
+                    for index, messages in notes.items():
+                        if index not in self._rows and index not in self._notes:
+                            self._notes[index] = messages
+                return retry_delay
@@ -1,8 +1,11 @@
+import logging
 import time
 
 from app import logger
 
 
-def sleep_for(delay: float) -> None:
-    logger.info(f"Sleep for {delay} seconds")
+def sleep_for(delay: float, level: int = logging.INFO) -> None:
+    if delay <= 0:
+        return
+    logger.log(level, "Sleep for %s seconds", delay)
     time.sleep(delay)
@@ -0,0 +1,130 @@
+import queue
+import threading
+from contextlib import AbstractContextManager
+from typing import Callable
+
+from .browser import ManagedBrowser
+from .leases import LeaseQueue
+from .processes import GroupPipeline, RowTask, run_leased_group
+from .sheet.writer import SheetWriter
+from . import logger
+
+
+class CrawlerPoolError(Exception):
+    pass
+
+
+class CrawlerPool:
+    def __init__(
+        self,
+        size: int,
+        open_browser: Callable[[], AbstractContextManager],
+        writer: SheetWriter | None = None,
+        leases: LeaseQueue | None = None,
+        pipeline: GroupPipeline | None = None,
+    ) -> None:
+        self.size = size
+        self.open_browser = open_browser
+        self.writer = writer
+        self.leases = leases
+        self.pipeline = pipeline
+
+        self._tasks: queue.Queue[list[RowTask] | None] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        # Workers with an open browser, guarded by ``_lock``
+        self._live = 0
+        self._lock = threading.Lock()
+        # Groups of the current round that ran, guarded by ``_lock``
+        self._ran: list[list[RowTask]] = []
+
+    def __enter__(self) -> "CrawlerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        # Browsers are launched one by one, concurrent driver setup is racy
+        for i in range(self.size):
+            ready = threading.Event()
+            thread = threading.Thread(
+                target=self._work, args=(ready,), name=f"crawler-{i}", daemon=True
+            )
+            thread.start()
+            ready.wait()
+            self._threads.append(thread)
+
+        if not self._live:
+            self.close()
+            raise CrawlerPoolError(f"None of the {self.size} crawler browsers started")
+        if self._live < self.size:
+            logger.info(f"Crawler pool runs {self._live} of {self.size} workers")
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def run_round(self, groups: list[list[RowTask]]) -> list[list[RowTask]]:
+        # Returns the groups that ran, see ``run_leased_group``
+        with self._lock:
+            if not self._live:
+                raise CrawlerPoolError("No crawler worker left")
+            self._ran = []
+            for group in groups:
+                self._tasks.put(group)
+
+        self._tasks.join()
+        if not self._live:
+            raise CrawlerPoolError("Every crawler worker stopped during the round")
+        with self._lock:
+            return self._ran
+
+    def _stopped(self) -> None:
+        with self._lock:
+            self._live -= 1
+            if self._live:
+                return
+
+            # Nobody is left to take the queued groups, ``join`` returns
+            while True:
+                try:
+                    self._tasks.get_nowait()
+                except queue.Empty:
+                    return
+                self._tasks.task_done()
+
+    def _work(self, ready: threading.Event) -> None:
+        try:
+            with self.open_browser() as sb:
+                with self._lock:
+                    self._live += 1
+                ready.set()
+                try:
+                    self._serve(sb)
+                finally:
+                    self._stopped()
+
+        except Exception as e:
+            logger.exception(f"Crawler worker stopped: {e}")
+        finally:
+            ready.set()
+
+    def _serve(self, sb) -> None:
+        while True:
+            group = self._tasks.get()
+            try:
+                if group is None:
+                    return
+                if isinstance(sb, ManagedBrowser):
+                    sb.maintain()
+                if run_leased_group(sb, group, self.writer, self.leases, self.pipeline):
+                    with self._lock:
+                        self._ran.append(group)
+            except Exception as e:
+                logger.exception(e)
+            finally:
+                self._tasks.task_done()
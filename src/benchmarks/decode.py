@@ -0,0 +1,52 @@
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+
+from . import synthetic
+
+from app.gameboost.models import PageData, decode_lean_offers
+from app.processes import platten_offer
+
+
+def pydantic_decode(page_data: str) -> list:
+    return platten_offer(PageData.model_validate_json(page_data))
+
+
+def measure(decode: Callable[[str], list], page_data: str, repeat: int) -> tuple:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(page_data)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    offers = decode(page_data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del offers
+
+    return best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare offer decoders")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'offers':>8} {'decoder':>9} {'best ms':>10} {'peak MiB':>10}")
+    for size in args.sizes:
+        page_data = synthetic.make_page_data(size)
+        for name, decode in (
+            ("pydantic", pydantic_decode),
+            ("lean", decode_lean_offers),
+        ):
+            best, peak = measure(decode, page_data, args.repeat)
+            print(f"{size:>8} {name:>9} {best * 1000:>10.2f} {peak / 2**20:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import random
+import time
+
+from . import synthetic
+
+from app.gameboost.models import decode_lean_offers
+from app.processes import OfferColumns, evaluate_offers
+from app.sheet.blacklist import blacklist_cache
+from app.sheet.models import RowRun
+
+
+def make_run_rows(
+    count: int, seed: int = 0
+) -> tuple[list[RowRun], list[frozenset[str]]]:
+    rng = random.Random(seed)
+    run_rows: list[RowRun] = []
+    blacklists: list[frozenset[str]] = []
+    for index in range(count):
+        blacklist = frozenset(f"seller-{rng.randint(1, 5000)}" for _ in range(200))
+        run_row = RowRun(
+            sheet_id="benchmark",
+            sheet_name="benchmark",
+            index=index + 2,
+            CHECK="1",
+            PRODUCT_NAME=f"Product {index}",
+            PRODUCT_COMPARE="https://gameboost.com/benchmark",
+            FEEDBACK_QTY=rng.choice([0, 10, 100, 1000]),
+            FEEDBACK_PERCENT=rng.choice([0, 90, 95, 98]),
+            DELIVERY_TIME=rng.choice([10, 60, 1440]),
+            MIN_QTY=rng.choice([1, 10, 100]),
+            STOCK1=rng.choice([0, 10, 1000]),
+            BLACKLIST_RANGE=f"Blacklist!A{index}",
+            RELAX=0,
+        )
+        blacklist_cache.put(
+            sheet_id=run_row.sheet_id,
+            sheet_name=run_row.sheet_name,
+            blacklist_range=run_row.BLACKLIST_RANGE,
+            names=list(blacklist),
+        )
+        run_rows.append(run_row)
+        blacklists.append(blacklist)
+
+    return run_rows, blacklists
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare offer evaluation engines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--rows", type=int, default=20)
+    args = parser.parse_args()
+
+    run_rows, blacklists = make_run_rows(args.rows)
+
+    print(
+        f"{'offers':>8} {'rows':>5} {'python ms':>10} {'columnar ms':>12} {'equal':>6}"
+    )
+    for size in args.sizes:
+        offers = decode_lean_offers(
+            synthetic.make_page_data(size, seed=size, our_seller_name="our-seller")
+        )
+
+        start = time.perf_counter()
+        expected = [evaluate_offers(offers, run_row) for run_row in run_rows]
+        python_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = OfferColumns(offers).evaluate_many(run_rows, blacklists)
+        columnar_time = time.perf_counter() - start
+
+        print(
+            f"{size:>8} {len(run_rows):>5} {python_time * 1000:>10.2f} "
+            f"{columnar_time * 1000:>12.2f} {str(results == expected):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import Counter
+
+from gspread.utils import a1_range_to_grid_range
+from gspread.worksheet import ValueRange
+
+
+class FakeWorksheet:
+    # In-memory stand-in for ``gspread.Worksheet`` with the calls used by
+    # ``app.sheet``, every call is counted and delayed by ``latency`` seconds
+    def __init__(self, title: str, latency: float = 0) -> None:
+        self.title = title
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.cells: dict[tuple[int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def _call(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def set_row(self, row: int, values: list) -> None:
+        for col, value in enumerate(values, start=1):
+            if value is not None and value != "":
+                self.cells[(row, col)] = str(value)
+
+    def _bounds(self) -> tuple[int, int]:
+        if not self.cells:
+            return 0, 0
+        return max(r for r, _ in self.cells), max(c for _, c in self.cells)
+
+    def _read(self, a1_range: str) -> ValueRange:
+        a1_range = a1_range.split("!")[-1]
+        grid = a1_range_to_grid_range(a1_range)
+        max_row, max_col = self._bounds()
+        start_row = grid.get("startRowIndex", 0) + 1
+        end_row = grid.get("endRowIndex", max_row)
+        start_col = grid.get("startColumnIndex", 0) + 1
+        end_col = grid.get("endColumnIndex", max_col)
+
+        values = []
+        for row in range(start_row, end_row + 1):
+            values.append(
+                [
+                    self.cells.get((row, col), "")
+                    for col in range(start_col, end_col + 1)
+                ]
+            )
+
+        # Like the Sheets API, trailing empty cells and rows are not returned
+        for row_values in values:
+            while row_values and row_values[-1] == "":
+                row_values.pop()
+        while values and not values[-1]:
+            values.pop()
+
+        return ValueRange.from_json(
+            {
+                "range": f"{self.title}!{a1_range}",
+                "majorDimension": "ROWS",
+                "values": values,
+            }
+        )
+
+    def get(self, a1_range: str) -> ValueRange:
+        self._call("get")
+        return self._read(a1_range)
+
+    def batch_get(self, ranges: list[str]) -> list[ValueRange]:
+        self._call("batch_get")
+        return [self._read(a1_range) for a1_range in ranges]
+
+    def col_values(self, col: int) -> list[str]:
+        self._call("col_values")
+        max_row, _ = self._bounds()
+        return [self.cells.get((row, col), "") for row in range(1, max_row + 1)]
+
+    def batch_update(self, data: list[dict]) -> None:
+        self._call("batch_update")
+        for update in data:
+            grid = a1_range_to_grid_range(update["range"].split("!")[-1])
+            for row_offset, row_values in enumerate(update["values"]):
+                for col_offset, value in enumerate(row_values):
+                    cell = (
+                        grid["startRowIndex"] + row_offset + 1,
+                        grid["startColumnIndex"] + col_offset + 1,
+                    )
+                    if value is not None:
+                        self.cells[cell] = str(value)
+
+    def cell(self, row: int, col: int) -> str:
+        return self.cells.get((row, col), "")
+
+
+class FakeSpreadsheet:
+    def __init__(self, client: "FakeClient", sheet_id: str) -> None:
+        self.client = client
+        self.id = sheet_id
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self.client.calls["worksheet"] += 1
+        return self.client.worksheets.setdefault(
+            (self.id, title), FakeWorksheet(title, latency=self.client.latency)
+        )
+
+
+class FakeClient:
+    # Stand-in for the authorized ``gspread.Client`` of ``gsheet_cache``
+    def __init__(self, latency: float = 0) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.worksheets: dict[tuple[str, str], FakeWorksheet] = {}
+
+    def open_by_key(self, sheet_id: str) -> FakeSpreadsheet:
+        self.calls["open_by_key"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return FakeSpreadsheet(self, sheet_id)
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values()) + sum(
+            sum(worksheet.calls.values()) for worksheet in self.worksheets.values()
+        )
@@ -0,0 +1,231 @@
+import argparse
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from . import synthetic
+from .fake_sheet import FakeClient, FakeWorksheet
+
+from app import config, processes
+from app.gameboost import crwl
+from app.gameboost import models as gameboost_models
+from app.processes import GroupPipeline, OfferColumns
+from app.shared.lru import LRUCache
+from app.sheet.blacklist import blacklist_cache
+from app.sheet.cell_cache import cell_cache
+from app.sheet.g_sheet import gsheet_cache
+from app.sheet.models import RowRun
+from app.sheet.writer import SheetWriter
+
+STAGES = ("fetch", "extract", "parse", "validate", "filter", "rank", "write")
+BLACKLIST_RANGE = "Z2:Z50"
+
+
+class FakeCDP:
+    def __init__(self, browser: "FakeBrowser") -> None:
+        self.browser = browser
+
+    def sleep(self, seconds: float) -> None:
+        pass
+
+    def get_page_source(self) -> str:
+        return self.browser.pages[self.browser.url]
+
+    def get_element_attribute(self, selector: str, attribute: str) -> str:
+        return self.browser.page_data[self.browser.url]
+
+
+class FakeBrowser:
+    # Serves synthetic pages in place of the SeleniumBase ``sb`` object
+    def __init__(self, page_data: dict[str, str]) -> None:
+        self.page_data = page_data
+        self.pages = {
+            url: synthetic.make_page_source(data) for url, data in page_data.items()
+        }
+        self.url = ""
+        self.cdp = FakeCDP(self)
+
+    def get(self, url: str) -> None:
+        self.url = url
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.totals: defaultdict[str, float] = defaultdict(float)
+
+    def wrap(self, stage: str, func):
+        @wraps(func)
+        def inner(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[stage] += time.perf_counter() - start
+
+        return inner
+
+    @contextmanager
+    def patch(self):
+        targets = [
+            ("fetch", crwl, "get_page_source"),
+            ("extract", crwl, "extract_data_page_with_scan"),
+            ("extract", crwl, "extract_data_page_with_soup"),
+            ("extract", crwl, "extract_data_page_with_cdp"),
+            ("parse", gameboost_models, "parse_lean_payload"),
+            ("decode", processes, "decode_page"),
+            ("filter", processes, "filter_offers_and_our_offer"),
+            ("filter", OfferColumns, "valid_masks"),
+            ("rank", processes, "find_min_valid_offer"),
+            ("rank", processes, "find_my_offer_top"),
+            ("rank", OfferColumns, "our_offer_and_top"),
+            ("write", FakeWorksheet, "batch_update"),
+        ]
+        originals = [(owner, name, getattr(owner, name)) for _, owner, name in targets]
+        try:
+            for stage, owner, name in targets:
+                setattr(owner, name, self.wrap(stage, getattr(owner, name)))
+            yield self
+        finally:
+            for owner, name, original in originals:
+                setattr(owner, name, original)
+
+    def stage_totals(self) -> dict[str, float]:
+        totals = dict(self.totals)
+        # Lean decoding is the typed JSON parse followed by the projection into
+        # records, the pydantic decoder parses and validates in one call
+        totals["validate"] = totals.get("decode", 0) - totals.get("parse", 0)
+        return totals
+
+
+def build_sheet(client: FakeClient, rows: int, urls: list[str]) -> FakeWorksheet:
+    worksheet = client.worksheets.setdefault(
+        (config.SPREADSHEET_KEY, config.SHEET_NAME),
+        FakeWorksheet(config.SHEET_NAME, latency=client.latency),
+    )
+    worksheet.set_row(1, ["CHECK", "PRODUCT_NAME", "PRODUCT_COMPARE"])
+    for i in range(rows):
+        # A..R: run flag, product, url, eight output columns, thresholds
+        worksheet.set_row(
+            i + 2,
+            ["1", f"Product {i}", urls[i % len(urls)]]
+            + [""] * 8
+            + [10, 90, 1440, 10, 1, BLACKLIST_RANGE, 0],
+        )
+    for i in range(20):
+        worksheet.cells[(i + 2, 26)] = f"seller-{i * 97}"
+
+    return worksheet
+
+
+def reset_state(client: FakeClient) -> None:
+    gsheet_cache.set_client(client)
+    # The in-memory sheet has no quota to respect
+    gsheet_cache.governor = None
+    blacklist_cache.invalidate()
+    cell_cache.invalidate(config.SPREADSHEET_KEY, config.SHEET_NAME)
+    processes.page_cache = LRUCache(maxsize=config.PAGE_CACHE_SIZE)
+    processes.row_result_cache = LRUCache(maxsize=config.PAGE_CACHE_SIZE * 4)
+
+
+def run_scenario(
+    scenario: str, rows: int, products: int, offers: int, latency: float
+) -> tuple[float, dict[str, float], int, Counter]:
+    client = FakeClient(latency=latency)
+    reset_state(client)
+    urls = [f"https://gameboost.com/benchmark/{i}" for i in range(products)]
+    build_sheet(client, rows, urls)
+    page_data = {
+        url: synthetic.make_page_data(offers, seed=i, our_seller_name="our-seller")
+        for i, url in enumerate(urls)
+    }
+    sb = FakeBrowser(page_data)
+
+    # Imported here, ``main`` pulls in SeleniumBase
+    from main import run_in_loop
+
+    with StageTimer().patch() as timer:
+        start = time.perf_counter()
+        if scenario == "run":
+            for index in range(2, rows + 2):
+                processes.run(sb, index)
+        else:
+            with SheetWriter(
+                model=RowRun,
+                sheet_id=config.SPREADSHEET_KEY,
+                sheet_name=config.SHEET_NAME,
+                batch_size=config.WRITE_BATCH_SIZE,
+                flush_interval=config.WRITE_FLUSH_INTERVAL,
+                max_pending=config.WRITE_MAX_PENDING,
+            ) as writer:
+                if scenario == "pipelined":
+                    with GroupPipeline(
+                        writer=writer, queue_size=config.PIPELINE_QUEUE_SIZE
+                    ) as pipeline:
+                        run_in_loop(sb, writer, pipeline=pipeline)
+                else:
+                    run_in_loop(sb, writer)
+        elapsed = time.perf_counter() - start
+
+    calls = Counter(client.calls)
+    for worksheet in client.worksheets.values():
+        calls.update(worksheet.calls)
+
+    return elapsed, timer.stage_totals(), client.total_calls(), calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-stage timings and Sheets calls of the crawl pipeline"
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=["run", "run_in_loop", "pipelined"],
+        choices=["run", "run_in_loop", "pipelined"],
+    )
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--products", type=int, default=10)
+    parser.add_argument("--offers", type=int, nargs="+", default=[10, 1_000, 10_000])
+    parser.add_argument(
+        "--latency", type=float, default=0, help="simulated Sheets latency (s)"
+    )
+    parser.add_argument(
+        "--max-calls-per-row",
+        type=float,
+        default=None,
+        help="exit with an error when a scenario makes more Sheets calls per row",
+    )
+    args = parser.parse_args()
+
+    failed = False
+
+    header = f"{'scenario':>12} {'offers':>7} {'ms/row':>8}"
+    header += "".join(f" {stage:>9}" for stage in STAGES)
+    header += f" {'calls/row':>10}"
+    print(header)
+    for scenario in args.scenarios:
+        for offers in args.offers:
+            elapsed, totals, total_calls, calls = run_scenario(
+                scenario, args.rows, args.products, offers, args.latency
+            )
+            line = f"{scenario:>12} {offers:>7} {elapsed * 1000 / args.rows:>8.2f}"
+            line += "".join(
+                f" {totals.get(stage, 0) * 1000 / args.rows:>9.3f}" for stage in STAGES
+            )
+            line += f" {total_calls / args.rows:>10.2f}"
+            print(line)
+            print(f"{'':>12} sheets calls: {dict(calls)}")
+
+            if (
+                args.max_calls_per_row is not None
+                and total_calls / args.rows > args.max_calls_per_row
+            ):
+                failed = True
+
+    if failed:
+        raise SystemExit(f"More than {args.max_calls_per_row} Sheets calls per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import time
+from collections import Counter
+
+from . import synthetic
+from .fake_sheet import FakeClient
+from .pipeline import build_sheet, reset_state
+
+from app import config
+from app.gameboost import crwl
+from app.gameboost.capture import CaptureStore
+from app.processes import GroupPipeline
+from app.sheet.models import RowRun
+from app.sheet.writer import SheetWriter
+
+
+def synthesize(path: str, products: int, offers: int) -> None:
+    # A capture directory of synthetic pages, for runs without a recording
+    store = CaptureStore(path)
+    for i in range(products):
+        store.record(
+            f"https://gameboost.com/replay/{i}",
+            synthetic.make_page_data(offers, seed=i, our_seller_name="our-seller"),
+        )
+
+
+def product_urls(store: CaptureStore) -> list[str]:
+    # Follow-up pages are fetched through the first page, rows only need those
+    return sorted(url for url in store.index() if crwl.find_page_param(url) is None)
+
+
+def replay(
+    path: str, rows: int | None, rounds: int, latency: float, pipelined: bool
+) -> None:
+    config.FETCH_BACKEND = "replay"
+    crwl.capture_store = CaptureStore(path)
+    urls = product_urls(crwl.capture_store)
+    if not urls:
+        raise SystemExit(f"No captured pages in {crwl.capture_store.path}")
+
+    rows = rows or len(urls)
+    client = FakeClient(latency=latency)
+    reset_state(client)
+    build_sheet(client, rows, urls)
+
+    # Imported here, ``main`` pulls in SeleniumBase
+    from main import run_in_loop
+
+    print(f"Replay {rows} rows over {len(urls)} captured products")
+    with SheetWriter(
+        model=RowRun,
+        sheet_id=config.SPREADSHEET_KEY,
+        sheet_name=config.SHEET_NAME,
+        batch_size=config.WRITE_BATCH_SIZE,
+        flush_interval=config.WRITE_FLUSH_INTERVAL,
+        max_pending=config.WRITE_MAX_PENDING,
+    ) as writer:
+        for round_number in range(1, rounds + 1):
+            start = time.perf_counter()
+            if pipelined:
+                with GroupPipeline(
+                    writer=writer, queue_size=config.PIPELINE_QUEUE_SIZE
+                ) as pipeline:
+                    run_in_loop(None, writer, pipeline=pipeline)
+            else:
+                run_in_loop(None, writer)
+            elapsed = time.perf_counter() - start
+            print(f"round {round_number}: {elapsed:.3f}s, {rows / elapsed:,.0f} rows/s")
+
+    calls = Counter(client.calls)
+    for worksheet in client.worksheets.values():
+        calls.update(worksheet.calls)
+    print(f"sheets calls: {dict(calls)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run main.run_in_loop from captured pages and an in-memory sheet"
+    )
+    parser.add_argument("capture_dir", help="directory recorded with CAPTURE_DIR")
+    parser.add_argument("--rows", type=int, default=None, help="default: one per url")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="simulated Sheets latency (s)"
+    )
+    parser.add_argument("--pipelined", action="store_true")
+    parser.add_argument(
+        "--synthesize",
+        type=int,
+        default=0,
+        metavar="PRODUCTS",
+        help="first write synthetic pages for this many products",
+    )
+    parser.add_argument("--offers", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.synthesize:
+        synthesize(args.capture_dir, args.synthesize, args.offers)
+
+    replay(args.capture_dir, args.rows, args.rounds, args.latency, args.pipelined)
+
+
+if __name__ == "__main__":
+    main()
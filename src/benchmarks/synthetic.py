@@ -0,0 +1,77 @@
+import html
+import json
+import random
+
+
+def make_offer(
+    offer_id: int, rng: random.Random, seller_name: str | None = None
+) -> dict:
+    seller_id = rng.randint(1, 5000)
+    price = round(rng.uniform(1, 100), 2)
+    return {
+        "id": offer_id,
+        "title": f"Offer {offer_id}",
+        "description": "Lorem ipsum dolor sit amet " * 4,
+        "seller": {
+            "id": seller_id,
+            "username": seller_name or f"seller-{seller_id}",
+            "avatar": f"https://cdn.example.com/avatars/{seller_id}.png",
+            "rating": {
+                "value": round(rng.uniform(80, 100), 1),
+                "amount": rng.randint(0, 5000),
+                "format": "percent",
+            },
+            "total_ratings": rng.randint(0, 5000),
+            "is_online": rng.random() < 0.5,
+        },
+        "price": {"amount": price, "currency": {"symbol": "€", "code": "EUR"}},
+        "local_price": {"amount": round(price * 1.08, 2), "currency": "USD"},
+        "stock": rng.choice([None, rng.randint(1, 10000)]),
+        "min_quantity": rng.choice([None, 1, rng.randint(1, 50)]),
+        "delivery_time": {"seconds": rng.choice([300, 900, 3600, 86400])},
+        "tags": ["instant", "safe"],
+    }
+
+
+def make_page_data(
+    offer_count: int,
+    seed: int = 0,
+    our_seller_name: str | None = None,
+    current_page: int = 1,
+    last_page: int = 1,
+) -> str:
+    rng = random.Random(seed)
+    offers = [make_offer(offer_id, rng) for offer_id in range(offer_count)]
+    if our_seller_name and offers:
+        offers[rng.randrange(len(offers))] = make_offer(
+            offer_count, rng, seller_name=our_seller_name
+        )
+
+    return json.dumps(
+        {
+            "component": "Game/Offers",
+            "props": {
+                "auth": {"user": None},
+                "model": {
+                    "currency_offer": None,
+                    "currencies": {
+                        "current_page": current_page,
+                        "last_page": last_page,
+                        "data": offers,
+                    },
+                },
+            },
+            "url": "/offers",
+            "version": "benchmark",
+        }
+    )
+
+
+def make_page_source(page_data: str) -> str:
+    return (
+        "<!DOCTYPE html><html><head><title>Offers</title>"
+        '<link rel="stylesheet" href="/app.css"><script src="/app.js"></script>'
+        "</head><body>"
+        f'<div id="app" data-page="{html.escape(page_data, quote=True)}"></div>'
+        "</body></html>"
+    )
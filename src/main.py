@@ -1,34 +1,229 @@
+import time
+from contextlib import contextmanager, nullcontext
+
 from seleniumbase import SB
 
-from app.processes import run
+from app.browser import ManagedBrowser
+from app.gameboost.blocker import ResourceBlocker, split_list
+from app.history import price_history
+from app.leases import LeaseQueue, create_lease_queue
+from app.processes import (
+    GroupPipeline,
+    RowTask,
+    group_run_rows,
+    log_cache_stats,
+    run_leased_group,
+)
 from app import logger, config
+from app.scheduler import AdaptiveScheduler
+from app.shared.breaker import CircuitOpenError
+from app.shared.metrics import start_metrics_server
+from app.sheet.governor import SheetsGovernor, sheets_governor
 from app.sheet.models import RowRun
+from app.sheet.writer import SheetWriter
 from app.utils import sleep_for
+from app.workers import CrawlerPool, CrawlerPoolError
+
+HOME_URL = "https://gameboost.com/"
+
+
+@contextmanager
+def open_browser():
+    with SB(uc=True, locale="en", disable_js=True, headless=True) as sb:
+        sb.activate_cdp_mode(HOME_URL)
+        if config.BLOCK_RESOURCES:
+            sb.resource_blocker = ResourceBlocker(
+                resource_types=split_list(config.BLOCK_RESOURCE_TYPES),
+                url_patterns=split_list(config.BLOCK_URL_PATTERNS),
+            )
+            sb.resource_blocker.install(sb)
+        yield sb
 
 
-def run_in_loop(sb):
-    run_indexes = RowRun.get_run_indexes(
-        sheet_id=config.SPREADSHEET_KEY, sheet_name=config.SHEET_NAME, col_index=1
+def managed_browser() -> ManagedBrowser:
+    return ManagedBrowser(
+        open_session=open_browser,
+        max_pages=config.BROWSER_MAX_PAGES,
+        max_rss_mb=config.BROWSER_MAX_RSS_MB,
+        standby=config.BROWSER_STANDBY,
     )
-    logger.info(f"Run indexes: {run_indexes}")
-    for index in run_indexes:
+
+
+# Last rows read from the sheet, crawled again while Sheets is unreachable
+last_run_rows: dict[int, RowRun | None] = {}
+
+
+def get_run_rows() -> dict[int, RowRun | None]:
+    # Once there are rows to fall back on, a throttled or failing read is not
+    # waited for in the crawl thread, the next round reads again
+    try:
+        with sheets_governor.non_blocking() if last_run_rows else nullcontext():
+            run_rows = RowRun.get_run_rows(
+                sheet_id=config.SPREADSHEET_KEY, sheet_name=config.SHEET_NAME
+            )
+    except Exception as e:
+        if not last_run_rows or not (
+            isinstance(e, CircuitOpenError) or SheetsGovernor.is_retryable(e)
+        ):
+            raise
+        logger.info(f"Reuse last run rows: {e}")
+        return last_run_rows
+
+    last_run_rows.clear()
+    last_run_rows.update(run_rows)
+    logger.info(f"Run indexes: {list(run_rows.keys())}")
+    return run_rows
+
+
+def run_groups(
+    sb,
+    groups: list[list[RowTask]],
+    writer: SheetWriter | None = None,
+    pool: CrawlerPool | None = None,
+    leases: LeaseQueue | None = None,
+    pipeline: GroupPipeline | None = None,
+) -> list[list[RowTask]]:
+    # Returns the groups that ran, skipped and failed ones are left out
+    logger.info(f"Distinct products: {len(groups)}")
+    ran: list[list[RowTask]] = []
+    if pool:
+        ran = pool.run_round(groups)
+    else:
+        for group in groups:
+            try:
+                if isinstance(sb, ManagedBrowser):
+                    sb.maintain()
+                if run_leased_group(sb, group, writer, leases, pipeline):
+                    ran.append(group)
+            except Exception as e:
+                logger.exception(e)
+
+    if pipeline:
+        pipeline.drain()
+    return ran
+
+
+def run_in_loop(
+    sb,
+    writer: SheetWriter | None = None,
+    pool: CrawlerPool | None = None,
+    leases: LeaseQueue | None = None,
+    pipeline: GroupPipeline | None = None,
+):
+    run_groups(sb, group_run_rows(get_run_rows()), writer, pool, leases, pipeline)
+    log_cache_stats()
+    sleep_for(config.RELAX_TIME_EACH_ROUND)
+
+
+def run_adaptive(
+    sb,
+    writer: SheetWriter | None = None,
+    pool: CrawlerPool | None = None,
+    leases: LeaseQueue | None = None,
+    pipeline: GroupPipeline | None = None,
+):
+    scheduler = AdaptiveScheduler(
+        min_interval=config.SCHEDULER_MIN_INTERVAL,
+        max_interval=config.SCHEDULER_MAX_INTERVAL,
+    )
+    last_sync: float | None = None
+
+    while True:
         try:
-            run(sb, index)
+            now = time.monotonic()
+            if last_sync is None or now - last_sync >= config.SCHEDULER_SYNC_INTERVAL:
+                scheduler.sync(get_run_rows())
+                last_sync = now
+                log_cache_stats()
+
+            groups = scheduler.due_groups()
+            if groups:
+                ran = run_groups(sb, groups, writer, pool, leases, pipeline)
+                ran_ids = {id(group) for group in ran}
+                scheduler.complete(ran)
+                scheduler.postpone(
+                    [group for group in groups if id(group) not in ran_ids]
+                )
+                continue
+
+            wait = config.SCHEDULER_SYNC_INTERVAL - (time.monotonic() - last_sync)
+            next_due_in = scheduler.next_due_in()
+            if next_due_in is not None:
+                wait = min(wait, next_due_in)
+            sleep_for(max(wait, 0))
+
+        except CrawlerPoolError:
+            raise
         except Exception as e:
             logger.exception(e)
+            sleep_for(config.RELAX_TIME_EACH_ROUND)
 
-    sleep_for(config.RELAX_TIME_EACH_ROUND)
+
+def loop_forever(
+    sb,
+    writer: SheetWriter,
+    pool: CrawlerPool | None = None,
+    leases: LeaseQueue | None = None,
+    pipeline: GroupPipeline | None = None,
+):
+    if config.SCHEDULER == "adaptive":
+        run_adaptive(sb, writer, pool, leases, pipeline)
+        return
+
+    while True:
+        try:
+            run_in_loop(sb, writer, pool, leases, pipeline)
+        except CrawlerPoolError:
+            raise
+        except Exception as e:
+            logger.exception(e)
+            sleep_for(config.RELAX_TIME_EACH_ROUND)
 
 
 def main():
-    with SB(uc=True, locale="en", disable_js=True, headless=True) as sb:
-        url = "https://gameboost.com/"
-        sb.activate_cdp_mode(url)
-        while True:
-            try:
-                run_in_loop(sb)
-            except Exception as e:
-                logger.exception(e)
+    if config.METRICS_PORT:
+        start_metrics_server(config.METRICS_PORT)
+
+    leases = create_lease_queue(
+        backend=config.COORDINATION,
+        path=config.LEASE_DB_PATH,
+        worker_id=config.WORKER_ID,
+        lease_seconds=config.LEASE_SECONDS,
+        repeat_after=config.LEASE_REPEAT_INTERVAL,
+    )
+
+    with (
+        price_history or nullcontext(),
+        SheetWriter(
+            model=RowRun,
+            sheet_id=config.SPREADSHEET_KEY,
+            sheet_name=config.SHEET_NAME,
+            batch_size=config.WRITE_BATCH_SIZE,
+            flush_interval=config.WRITE_FLUSH_INTERVAL,
+            max_pending=config.WRITE_MAX_PENDING,
+        ) as writer,
+        (
+            GroupPipeline(
+                writer=writer,
+                queue_size=config.PIPELINE_QUEUE_SIZE,
+                workers=config.CRAWL_WORKERS,
+            )
+            if config.PIPELINED
+            else nullcontext()
+        ) as pipeline,
+    ):
+        if config.CRAWL_WORKERS > 1:
+            with CrawlerPool(
+                size=config.CRAWL_WORKERS,
+                open_browser=managed_browser,
+                writer=writer,
+                leases=leases,
+                pipeline=pipeline,
+            ) as pool:
+                loop_forever(None, writer, pool, leases, pipeline)
+        else:
+            with managed_browser() as sb:
+                loop_forever(sb, writer, leases=leases, pipeline=pipeline)
 
 
 if __name__ == "__main__":
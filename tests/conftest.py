@@ -0,0 +1,8 @@
+import os
+
+# Tests run offline, ``app`` only needs a config to be importable
+os.environ.setdefault("KEYS_PATH", "keys.json")
+os.environ.setdefault("SPREADSHEET_KEY", "test")
+os.environ.setdefault("SHEET_NAME", "test")
+os.environ.setdefault("OUR_SELLER_NAME", "our-seller")
+os.environ.setdefault("RELAX_TIME_EACH_ROUND", "0")
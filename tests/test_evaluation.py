@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from app import config
+from app.gameboost.models import LeanOffer
+from app.processes import OfferColumns, evaluate_offers, evaluate_rows
+from app.sheet.blacklist import blacklist_cache
+from app.sheet.models import RowRun
+
+SELLERS = ["Alpha", "alpha", "Bravo", "charlie", "Delta", "echo"]
+BLACKLISTS = {
+    "Z1:Z5": ["Alpha", "delta"],
+    "Z6:Z9": ["nobody"],
+    "Z10:Z12": ["BRAVO", "Charlie", "echo", "our-seller"],
+    "Z13:Z14": [],
+}
+
+
+def make_offers(count: int, seed: int) -> list[LeanOffer]:
+    rng = random.Random(seed)
+    offers = []
+    for offer_id in range(count):
+        offers.append(
+            LeanOffer(
+                id=offer_id,
+                seller_id=rng.randint(1, 50),
+                # Our seller is listed more than once on some pages
+                seller_name=rng.choice(SELLERS + [config.OUR_SELLER_NAME]),
+                rating=rng.choice([90.0, 95.5, 99.0, 100.0]),
+                total_ratings=rng.randint(0, 100),
+                # Few distinct prices, so ties are common
+                price=rng.choice([1.0, 1.5, 2.0, 2.5, 3.0]),
+                local_price=rng.choice([1.1, 1.6, 2.2]),
+                stock=rng.choice([None, 0, 5, 50]),
+                min_quantity=rng.choice([None, 0, 1, 10]),
+                delivery_seconds=rng.choice([60, 900, 3600, 86400]),
+            )
+        )
+    return offers
+
+
+def make_rows(seed: int) -> list[RowRun]:
+    rng = random.Random(seed)
+    rows = []
+    for index in range(2, 22):
+        rows.append(
+            RowRun.model_validate(
+                {
+                    "sheet_id": "test",
+                    "sheet_name": "test",
+                    "index": index,
+                    "CHECK": "1",
+                    "PRODUCT_NAME": f"Product {index}",
+                    "PRODUCT_COMPARE": "https://gameboost.com/p",
+                    # The last row asks for more than any offer has
+                    "FEEDBACK_QTY": rng.choice([0, 10, 50]) if index < 21 else 1000,
+                    "FEEDBACK_PERCENT": rng.choice([0, 95, 99.5]),
+                    "DELIVERY_TIME": rng.choice([1, 15, 60, 1440]),
+                    "MIN_QTY": rng.choice([0, 1, 5, 20]),
+                    "STOCK1": rng.choice([0, 1, 10, 100]),
+                    "BLACKLIST_RANGE": (
+                        rng.choice(list(BLACKLISTS)) if index < 21 else "Z6:Z9"
+                    ),
+                    "RELAX": 0,
+                }
+            )
+        )
+    return rows
+
+
+@pytest.fixture(params=[False, True], ids=["case-sensitive", "case-insensitive"])
+def blacklists(request, monkeypatch):
+    monkeypatch.setattr(blacklist_cache, "case_insensitive", request.param)
+    monkeypatch.setattr(blacklist_cache, "ttl", float("inf"))
+    for blacklist_range, names in BLACKLISTS.items():
+        blacklist_cache.put("test", "test", blacklist_range, names)
+    yield
+    blacklist_cache.invalidate()
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.usefixtures("blacklists")
+def test_evaluate_many_matches_python_evaluation(seed: int) -> None:
+    offers = make_offers(count=seed * 5, seed=seed)
+    # Empty blacklists raise, like in ``evaluate_rows``
+    rows = [row for row in make_rows(seed) if BLACKLISTS[row.BLACKLIST_RANGE]]
+
+    evaluations = OfferColumns(offers).evaluate_many(
+        rows, [row.get_blacklist() for row in rows]
+    )
+
+    assert evaluations == [evaluate_offers(offers, row) for row in rows]
+    assert rows[-1].FEEDBACK_QTY == 1000 and evaluations[-1].min_offer is None
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.usefixtures("blacklists")
+def test_evaluate_rows_engines_agree(seed: int, monkeypatch) -> None:
+    offers = make_offers(count=40, seed=seed)
+    rows = make_rows(seed)
+
+    monkeypatch.setattr(config, "EVALUATION_ENGINE", "python")
+    expected = evaluate_rows(offers, rows)
+    monkeypatch.setattr(config, "EVALUATION_ENGINE", "columnar")
+    results = evaluate_rows(offers, rows)
+
+    assert len(results) == len(expected)
+    for result, expected_result in zip(results, expected):
+        if isinstance(expected_result, Exception):
+            assert type(result) is type(expected_result)
+        else:
+            assert result == expected_result
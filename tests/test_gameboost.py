@@ -0,0 +1,168 @@
+import html
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from app.gameboost.exceptions import ChallengeError, CrwlError
+from app.gameboost.http_client import InertiaClient
+from app.gameboost.models import PageData
+from app.gameboost.parsers import (
+    extract_data_page_with_scan,
+    extract_data_page_with_soup,
+)
+
+FIXTURES_PATH = Path(__file__).parent.joinpath("fixtures")
+OFFERS_PAGE = FIXTURES_PATH.joinpath("offers_page.html").read_text(encoding="utf-8")
+DECOY = '<div id="app" data-page="{&quot;decoy&quot;: true}"></div>'
+
+
+def with_body_prefix(page_source: str, prefix: str) -> str:
+    return page_source.replace("<body", f"{prefix}<body", 1)
+
+
+@pytest.mark.parametrize(
+    "page_source",
+    [
+        OFFERS_PAGE,
+        OFFERS_PAGE.replace('id="app"', "id='app'").replace("<div ", "<DIV "),
+        with_body_prefix(OFFERS_PAGE, f"<!-- old layout: {DECOY} -->"),
+        with_body_prefix(OFFERS_PAGE, f"<script>const layout = '{DECOY}';</script>"),
+        with_body_prefix(OFFERS_PAGE, f"<style>/* {DECOY} */</style>"),
+    ],
+    ids=["plain", "single-quoted", "comment", "script", "style"],
+)
+def test_scan_and_soup_return_the_same_page_data(page_source: str) -> None:
+    scanned = extract_data_page_with_scan(page_source)
+    parsed = extract_data_page_with_soup(page_source)
+
+    assert scanned == parsed
+    assert PageData.model_validate_json(scanned) == PageData.model_validate_json(parsed)
+    assert len(PageData.model_validate_json(scanned).props.model.currencies.data) == 3
+
+
+@pytest.mark.parametrize(
+    "page_source",
+    [
+        '<html><body><div id="main"></div></body></html>',
+        f"<html><body><!-- {DECOY} --></body></html>",
+        f"<html><body><script>'{DECOY}'</script></body></html>",
+        '<html><body><div id="app"></div></body></html>',
+    ],
+    ids=["no-app", "comment-only", "script-only", "no-data-page"],
+)
+def test_scan_raises_without_a_real_app_tag(page_source: str) -> None:
+    with pytest.raises(CrwlError):
+        extract_data_page_with_scan(page_source)
+
+
+class InertiaServer(ThreadingHTTPServer):
+    # Stand-in for gameboost: the HTML page, its Inertia JSON visit and the
+    # 409 of a changed asset version, plus a challenge page
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), InertiaHandler)
+        self.page_data = json.loads(extract_data_page_with_soup(OFFERS_PAGE))
+        self.requests: list[tuple[str, bool]] = []
+
+    @property
+    def version(self) -> str:
+        return self.page_data["version"]
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class InertiaHandler(BaseHTTPRequestHandler):
+    server: InertiaServer
+
+    def do_GET(self) -> None:
+        inertia = self.headers.get("X-Inertia") == "true"
+        self.server.requests.append((self.path, inertia))
+
+        if self.path == "/challenge":
+            self.respond(403, "<html><title>Just a moment...</title></html>")
+        elif self.path == "/challenge-ok":
+            self.respond(200, '<html><script src="/cdn-cgi/challenge-platform/x.js">')
+        elif not inertia:
+            page_data = html.escape(json.dumps(self.server.page_data), quote=True)
+            self.respond(200, f'<html><div id="app" data-page="{page_data}"></div>')
+        elif self.headers.get("X-Inertia-Version") != self.server.version:
+            self.respond(409, "", {"X-Inertia-Location": self.server.url(self.path)})
+        else:
+            self.respond(
+                200,
+                json.dumps(self.server.page_data),
+                {"X-Inertia": "true", "Content-Type": "application/json"},
+            )
+
+    def respond(self, status: int, body: str, headers: dict | None = None) -> None:
+        payload = body.encode()
+        self.send_response(status)
+        for name, value in (headers or {"Content-Type": "text/html"}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def inertia_server():
+    server = InertiaServer()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_fetch_html(inertia_server: InertiaServer) -> None:
+    client = InertiaClient(mode="html")
+    url = inertia_server.url("/wow/gold")
+
+    assert json.loads(client.fetch(url)) == inertia_server.page_data
+    assert json.loads(client.fetch(url)) == inertia_server.page_data
+    assert inertia_server.requests == [("/wow/gold", False), ("/wow/gold", False)]
+
+
+def test_http_fetch_json_after_first_visit(inertia_server: InertiaServer) -> None:
+    client = InertiaClient(mode="json")
+    url = inertia_server.url("/wow/gold")
+
+    # The first visit is a full page, it tells the asset version
+    html_page_data = client.fetch(url)
+    json_page_data = client.fetch(url)
+
+    assert inertia_server.requests == [("/wow/gold", False), ("/wow/gold", True)]
+    assert PageData.model_validate_json(json_page_data) == PageData.model_validate_json(
+        html_page_data
+    )
+
+
+def test_http_fetch_version_change(inertia_server: InertiaServer) -> None:
+    client = InertiaClient(mode="json")
+    url = inertia_server.url("/wow/gold")
+    client.fetch(url)
+
+    inertia_server.page_data["version"] = "new-version"
+    assert json.loads(client.fetch(url))["version"] == "new-version"
+    assert json.loads(client.fetch(url))["version"] == "new-version"
+    # 409 on the stale version, a full page visit, then JSON again
+    assert inertia_server.requests == [
+        ("/wow/gold", False),
+        ("/wow/gold", True),
+        ("/wow/gold", False),
+        ("/wow/gold", True),
+    ]
+
+
+@pytest.mark.parametrize("path", ["/challenge", "/challenge-ok"])
+def test_http_fetch_challenge(inertia_server: InertiaServer, path: str) -> None:
+    with pytest.raises(ChallengeError):
+        InertiaClient(mode="json").fetch(inertia_server.url(path))
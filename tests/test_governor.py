@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from app.sheet.blacklist import BlacklistCache
+from app.sheet.governor import SheetsGovernor, SheetsThrottledError
+
+
+def make_governor() -> SheetsGovernor:
+    return SheetsGovernor(
+        reads_per_minute=6, writes_per_minute=6, burst=1, base_delay=5, max_delay=5
+    )
+
+
+def test_non_blocking_read_fails_instead_of_waiting():
+    governor = make_governor()
+    governor.acquire("get")
+
+    start = time.monotonic()
+    with governor.non_blocking():
+        with pytest.raises(SheetsThrottledError) as error:
+            governor.check("get")
+        # Writes have their own bucket
+        governor.check("batch_update")
+    assert time.monotonic() - start < 1
+    assert 0 < error.value.retry_in <= 10
+
+    # Blocking callers are not checked, they wait in ``acquire``
+    governor.check("get")
+
+
+def test_non_blocking_retry_raises_without_backoff():
+    governor = make_governor()
+    calls = []
+
+    @governor.retry(max_retries=5)
+    def read():
+        calls.append(threading.current_thread().name)
+        raise ConnectionError("down")
+
+    start = time.monotonic()
+    with governor.non_blocking():
+        with pytest.raises(ConnectionError):
+            read()
+    assert time.monotonic() - start < 1
+    assert len(calls) == 1
+
+
+def test_stale_blacklist_is_refreshed_in_background():
+    cache = BlacklistCache(ttl=0)
+    cache.put("test", "test", "Z1:Z5", ["Alpha"])
+
+    refreshed = threading.Event()
+    threads = []
+
+    def slow_prefetch(sheet_id, sheet_name, ranges):
+        threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        cache.put(sheet_id, sheet_name, ranges[0], ["Bravo"])
+        refreshed.set()
+
+    cache.prefetch = slow_prefetch
+
+    start = time.monotonic()
+    assert cache.get("test", "test", "Z1:Z5") == frozenset({"Alpha"})
+    assert cache.get("test", "test", "Z1:Z5") == frozenset({"Alpha"})
+    assert time.monotonic() - start < 0.2
+
+    assert refreshed.wait(2)
+    assert threads == ["blacklist-refresh"]
+    assert cache.get("test", "test", "Z1:Z5") == frozenset({"Bravo"})
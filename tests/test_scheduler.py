@@ -0,0 +1,54 @@
+import pytest
+
+from app.scheduler import AdaptiveScheduler
+from app.sheet.models import RowRun
+
+
+def make_row(index: int, check_interval="", price: str = "1.00") -> RowRun:
+    return RowRun.model_validate(
+        {
+            "sheet_id": "test",
+            "sheet_name": "test",
+            "index": index,
+            "CHECK": "1",
+            "PRODUCT_NAME": f"Product {index}",
+            "PRODUCT_COMPARE": f"https://gameboost.com/p{index}",
+            "LOWEST_PRICE_EUR": price,
+            "FEEDBACK_QTY": 0,
+            "FEEDBACK_PERCENT": 0,
+            "DELIVERY_TIME": 60,
+            "MIN_QTY": 0,
+            "STOCK1": 0,
+            "BLACKLIST_RANGE": "Z1:Z5",
+            "RELAX": 0,
+            "CHECK_INTERVAL": check_interval,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("", None), ("n/a", None), ("every hour", None), ("0", None), ("-5", None)]
+    + [("15", 15.0), ("2.5", 2.5), (30, 30.0), (None, None)],
+)
+def test_check_interval_is_lenient(value, expected):
+    assert make_row(2, value).CHECK_INTERVAL == expected
+
+
+def test_only_groups_that_ran_are_learned_from():
+    scheduler = AdaptiveScheduler(min_interval=10, max_interval=1000, history=3)
+    scheduler.sync({2: make_row(2), 3: make_row(3)})
+
+    groups = scheduler.due_groups()
+    assert [[index for index, _ in group] for group in groups] == [[2], [3]]
+    for _ in range(3):
+        # Row 3 is skipped each time, e.g. its lease is held by another worker
+        scheduler.complete(groups[:1])
+        scheduler.postpone(groups[1:])
+
+    # Row 2 ran unchanged and drifts away, row 3 never ran and keeps no history
+    assert list(scheduler._rows[2].changes) == [False, False]
+    assert scheduler.interval(scheduler._rows[2]) == 1000
+    assert scheduler._rows[3].signature is None
+    assert not scheduler._rows[3].changes
+    assert scheduler.interval(scheduler._rows[3]) == 10
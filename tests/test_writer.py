@@ -0,0 +1,66 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.shared.breaker import CircuitOpenError
+from app.sheet.writer import SheetWriter
+
+
+class FailingSheet:
+    # Stands in for the row model, ``batch_update`` fails ``failures`` times
+    def __init__(self, error: Exception, failures: int = 1_000_000) -> None:
+        self.error = error
+        self.failures = failures
+        self.attempts = 0
+        self.written: list[int] = []
+
+    def batch_update(self, sheet_id, sheet_name, list_object, notes) -> None:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error
+        self.written.extend(row.index for row in list_object)
+
+
+def run_writer(sheet: FailingSheet, rows: int, seconds: float) -> None:
+    writer = SheetWriter(
+        model=sheet,
+        sheet_id="test",
+        sheet_name="test",
+        batch_size=20,
+        flush_interval=0.1,
+        max_pending=200,
+    )
+    with writer:
+        for index in range(2, rows + 2):
+            writer.put(SimpleNamespace(index=index))
+        time.sleep(seconds)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [CircuitOpenError("sheets circuit is open"), ValueError("bad request")],
+    ids=["circuit-open", "error"],
+)
+def test_failed_flush_waits_before_retrying(error: Exception) -> None:
+    # A full batch stays pending while flushes fail
+    sheet = FailingSheet(error)
+    run_writer(sheet, rows=25, seconds=0.5)
+
+    # One flush per interval, plus the last one on close
+    assert 2 <= sheet.attempts <= 8
+
+
+def test_failed_flush_waits_for_the_circuit() -> None:
+    sheet = FailingSheet(CircuitOpenError("sheets circuit is open", retry_in=1))
+    run_writer(sheet, rows=25, seconds=0.5)
+
+    # The first attempt, then the last one on close
+    assert sheet.attempts <= 3
+
+
+def test_results_are_written_once_flushes_recover() -> None:
+    sheet = FailingSheet(ValueError("bad request"), failures=2)
+    run_writer(sheet, rows=25, seconds=0.5)
+
+    assert sorted(sheet.written) == list(range(2, 27))